@@ -1,14 +1,40 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from backend_utils import BackendUtils
+from code_export import ARCHIVE_FORMATS
 from code_generator import CodeGenerator
+from event_stream import EventBroadcaster
 import json
+import os
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-utils = BackendUtils()
-code_generator = CodeGenerator()
+# Built by create_services(). Worker processes import this script, so importing it must not start anything.
+utils = None
+code_generator = None
+events = None
+
+def create_services():
+    """Build the backend services and start their background threads; call once before serving"""
+    global utils, code_generator, events
+    utils = BackendUtils(sample_interval=2.0)
+    code_generator = CodeGenerator(
+        watch_templates=True,
+        lazy_templates=True,
+        history_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'code_history.db'),
+        write_behind=True
+    )
+    
+    # One producer feeds every /api/events client: sampler ticks and code generator events
+    events = EventBroadcaster()
+    if utils.system_sampler:
+        utils.system_sampler.add_listener(lambda sample: events.publish('metrics', sample, replace=True))
+    code_generator.add_listener(events.publish)
+    
+    # Start worker processes now rather than inside the first request that needs them
+    utils.expression_engine.start()
+    code_generator.validator.start()
 
 @app.route('/api/weather', methods=['GET'])
 def weather():
@@ -28,6 +54,32 @@ def system_info():
     result = utils.get_system_info()
     return jsonify({"response": result})
 
+@app.route('/api/system-info/history', methods=['GET'])
+def system_info_history():
+    """Get recent system metric samples as columns"""
+    history = utils.get_system_history(request.args.get('limit', type=int))
+    if history is None:
+        return jsonify({"success": False, "error": "System metrics are not being sampled"}), 503
+    return jsonify({"success": True, "history": history})
+
+@app.route('/api/events', methods=['GET'])
+def event_stream():
+    """Server-sent events: live metric samples and code generator events"""
+    subscription = events.subscribe()
+    if subscription is None:
+        return jsonify({"success": False, "error": "Too many event stream clients"}), 503
+    
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    response = Response(events.stream(subscription), mimetype='text/event-stream', headers=headers)
+    # The stream's own cleanup never runs if the body is not iterated (HEAD, aborted send)
+    response.call_on_close(lambda: events.unsubscribe(subscription))
+    return response
+
+@app.route('/api/events/stats', methods=['GET'])
+def event_stream_stats():
+    """Get event stream subscriber counts"""
+    return jsonify({"success": True, "stats": events.get_stats()})
+
 @app.route('/api/search', methods=['POST'])
 def search():
     """Perform a web search"""
@@ -44,7 +96,37 @@ def calculate():
     result = utils.calculate(expression)
     return jsonify({"response": result})
 
+@app.route('/api/calculate/batch', methods=['POST'])
+def calculate_batch():
+    """Evaluate an expression over columns of values, or many expressions at once"""
+    try:
+        data = request.get_json()
+        expression = data.get('expression')
+        expressions = data.get('expressions')
+        variables = data.get('variables')
+        
+        if variables is not None and not isinstance(variables, dict):
+            return jsonify({"success": False, "error": "variables must map names to values"}), 400
+        
+        if isinstance(expressions, list) and expressions and all(isinstance(item, str) for item in expressions):
+            return jsonify({"success": True, **utils.calculate_many(expressions, variables)})
+        
+        if not expression or not isinstance(expression, str):
+            return jsonify({"success": False, "error": "An expression or a list of expressions is required"}), 400
+        
+        results = utils.calculate_array(expression, variables or {})
+        return jsonify({"success": True, "results": results})
+        
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 # Code Generation Routes
+def valid_autocorrect(value):
+    """Autocorrect must be omitted or a non-negative edit distance"""
+    return value is None or (isinstance(value, int) and not isinstance(value, bool) and value >= 0)
+
 @app.route('/api/generate-code', methods=['POST'])
 def generate_code():
     """Generate code files based on voice commands"""
@@ -52,16 +134,85 @@ def generate_code():
         data = request.get_json()
         template_id = data.get('template_id')
         parameters = data.get('parameters', {})
+        save = bool(data.get('save', False))
+        autocorrect = data.get('autocorrect')
         
         if not template_id:
             return jsonify({"success": False, "error": "Template ID is required"}), 400
+        if not valid_autocorrect(autocorrect):
+            return jsonify({"success": False, "error": "autocorrect must be a non-negative edit distance"}), 400
         
-        result = code_generator.generate_code(template_id, parameters)
+        result = code_generator.generate_code(template_id, parameters, save, autocorrect)
         return jsonify(result)
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/generate-code/batch', methods=['POST'])
+def generate_code_batch():
+    """Generate many code files in one request"""
+    try:
+        data = request.get_json()
+        jobs = data.get('jobs', [])
+        
+        if not jobs or not isinstance(jobs, list):
+            return jsonify({"success": False, "error": "A non-empty list of jobs is required"}), 400
+        
+        results = code_generator.generate_code_batch(jobs)
+        succeeded = sum(1 for result in results if result['success'])
+        return jsonify({
+            "success": succeeded == len(results),
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded
+        })
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/generate-code/stream', methods=['POST'])
+def generate_code_stream():
+    """Generate code and stream it back as chunked NDJSON or raw text"""
+    try:
+        data = request.get_json()
+        template_id = data.get('template_id')
+        parameters = data.get('parameters', {})
+        stream_format = data.get('format', 'ndjson')
+        autocorrect = data.get('autocorrect')
+        
+        if not template_id:
+            return jsonify({"success": False, "error": "Template ID is required"}), 400
+        if stream_format not in ('ndjson', 'raw'):
+            return jsonify({"success": False, "error": "Format must be 'ndjson' or 'raw'"}), 400
+        if not valid_autocorrect(autocorrect):
+            return jsonify({"success": False, "error": "autocorrect must be a non-negative edit distance"}), 400
+        
+        stream = code_generator.generate_code_stream(template_id, parameters, autocorrect=autocorrect)
+        if not stream['success']:
+            return jsonify(stream)
+        
+        chunks = stream.pop('chunks')
+        
+        if stream_format == 'raw':
+            headers = {
+                "X-File-Id": stream['id'],
+                "X-Filename": stream['filename'],
+                "X-Language": stream['language']
+            }
+            return Response(stream_with_context(chunks), mimetype='text/plain', headers=headers)
+        
+        def ndjson():
+            # Metadata first, then content chunks, then the validation result
+            yield json.dumps({"type": "metadata", **stream}) + "\n"
+            for chunk in chunks:
+                yield json.dumps({"type": "chunk", "content": chunk}) + "\n"
+            yield json.dumps({"type": "end", "validation": stream['validation']}) + "\n"
+        
+        return Response(stream_with_context(ndjson()), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/analyze-requirements', methods=['POST'])
 def analyze_requirements():
     """Analyze natural language requirements to determine template and parameters"""
@@ -72,18 +223,52 @@ def analyze_requirements():
         if not requirements:
             return jsonify({"success": False, "error": "Requirements text is required"}), 400
         
-        analysis = code_generator.analyze_requirements(requirements)
+        analysis = code_generator.analyze_requirements_cached(requirements)
         return jsonify({"success": True, "analysis": analysis})
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/analyze-requirements/batch', methods=['POST'])
+def analyze_requirements_batch():
+    """Analyze a list of requirement strings in one request"""
+    try:
+        data = request.get_json()
+        requirements_list = data.get('requirements', [])
+        
+        if not requirements_list or not isinstance(requirements_list, list) \
+                or not all(isinstance(requirements, str) and requirements for requirements in requirements_list):
+            return jsonify({"success": False, "error": "A non-empty list of requirement strings is required"}), 400
+        
+        analyses = code_generator.analyze_requirements_batch(requirements_list)
+        return jsonify({
+            "success": True,
+            "analyses": analyses,
+            "cache": code_generator.get_analysis_cache_stats()
+        })
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/get-templates', methods=['GET'])
 def get_templates():
     """Get available code templates"""
     try:
         templates = code_generator.get_available_templates()
-        return jsonify({"success": True, "templates": templates})
+        catalog_hash = code_generator.get_catalog_hash()
+        response = jsonify({"success": True, "templates": templates, "catalog_hash": catalog_hash})
+        response.set_etag(catalog_hash)
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/render-cache/stats', methods=['GET'])
+def render_cache_stats():
+    """Get render cache hit/miss/eviction counters"""
+    try:
+        stats = code_generator.get_render_cache_stats()
+        return jsonify({"success": True, "stats": stats})
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -105,10 +290,85 @@ def save_file():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/save-files', methods=['POST'])
+def save_files():
+    """Save several generated files to disk in one request"""
+    try:
+        data = request.get_json()
+        file_ids = data.get('file_ids', [])
+        base_dir = data.get('base_dir')
+        
+        if not file_ids or not isinstance(file_ids, list):
+            return jsonify({"success": False, "error": "A non-empty list of file IDs is required"}), 400
+        
+        results = code_generator.save_files(file_ids, base_dir)
+        return jsonify({"success": all(result['success'] for result in results), "results": results})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+HISTORY_QUERY_ARGS = ('cursor', 'limit', 'order', 'language', 'template', 'since', 'until', 'fields')
+MAX_HISTORY_PAGE = 500
+
+def history_filters():
+    """Build history query filters from the request's query string"""
+    args = request.args
+    return {
+        "cursor": args.get('cursor', type=int),
+        "limit": max(1, min(args.get('limit', 50, type=int), MAX_HISTORY_PAGE)),
+        "descending": args.get('order', 'asc') == 'desc',
+        "language": args.get('language'),
+        "template_id": args.get('template'),
+        "since": args.get('since'),
+        "until": args.get('until'),
+        "include_content": args.get('fields', 'full') != 'metadata'
+    }
+
+@app.route('/api/export-files', methods=['POST'])
+def export_files():
+    """Stream a ZIP or tar.gz archive of generated files"""
+    try:
+        data = request.get_json(silent=True) or {}
+        file_ids = data.get('file_ids')
+        archive_format = data.get('format', 'zip')
+        
+        if archive_format not in ARCHIVE_FORMATS:
+            return jsonify({"success": False, "error": f"Format must be one of {sorted(ARCHIVE_FORMATS)}"}), 400
+        if file_ids is not None:
+            if not isinstance(file_ids, list):
+                return jsonify({"success": False, "error": "file_ids must be a list"}), 400
+            missing = code_generator.missing_generations(file_ids)
+            if missing:
+                return jsonify({"success": False, "error": "Files not found", "missing": missing}), 404
+        
+        _, mimetype, extension = ARCHIVE_FORMATS[archive_format]
+        archive = code_generator.export_files(file_ids, archive_format)
+        headers = {"Content-Disposition": f"attachment; filename=generated_files.{extension}"}
+        return Response(stream_with_context(archive), mimetype=mimetype, headers=headers)
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/save-status/<job_id>', methods=['GET'])
+def save_status(job_id):
+    """Check whether a queued save has reached the disk"""
+    try:
+        status = code_generator.get_save_status(job_id)
+        if status is None:
+            return jsonify({"success": False, "error": "Save job not found"}), 404
+        return jsonify({"success": True, "job": status})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/get-generated-files', methods=['GET'])
 def get_generated_files():
-    """Get list of all generated files"""
+    """Get list of all generated files, or one page when query arguments are given"""
     try:
+        if any(arg in request.args for arg in HISTORY_QUERY_ARGS):
+            page = code_generator.query_generated_files(**history_filters())
+            return jsonify({"success": True, "files": page['entries'], "next_cursor": page['next_cursor']})
+        
         files = code_generator.get_generated_files()
         return jsonify({"success": True, "files": files})
         
@@ -117,14 +377,63 @@ def get_generated_files():
 
 @app.route('/api/get-code-history', methods=['GET'])
 def get_code_history():
-    """Get code generation history"""
+    """Get code generation history, or one page when query arguments are given"""
     try:
+        if any(arg in request.args for arg in HISTORY_QUERY_ARGS):
+            page = code_generator.query_code_history(**history_filters())
+            return jsonify({"success": True, "history": page['entries'], "next_cursor": page['next_cursor']})
+        
         history = code_generator.get_code_history()
         return jsonify({"success": True, "history": history})
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/history/stats', methods=['GET'])
+def history_stats():
+    """Get retention usage of the generated files store"""
+    try:
+        stats = code_generator.get_history_stats()
+        return jsonify({"success": True, "stats": stats})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+MAX_SEARCH_RESULTS = 100
+
+@app.route('/api/search-code', methods=['GET'])
+def search_code():
+    """Full-text search over templates and generated code"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"success": False, "error": "Search query 'q' is required"}), 400
+        
+        kind = request.args.get('type')
+        if kind not in (None, 'template', 'generation'):
+            return jsonify({"success": False, "error": "type must be 'template' or 'generation'"}), 400
+        
+        results = code_generator.search_code(
+            query,
+            limit=max(1, min(request.args.get('limit', 20, type=int), MAX_SEARCH_RESULTS)),
+            kind=kind,
+            language=request.args.get('language')
+        )
+        return jsonify({"success": True, "results": results})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/search-code/stats', methods=['GET'])
+def search_code_stats():
+    """Get the size of the code search index"""
+    try:
+        stats = code_generator.get_search_stats()
+        return jsonify({"success": True, "stats": stats})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
@@ -132,4 +441,5 @@ def health():
 
 if __name__ == '__main__':
     print("Starting JARVIS Python Backend...")
+    create_services()
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -7,26 +7,27 @@ import random
 import datetime
 from typing import Dict, Any, List, Optional
 
+from expression_engine import ExpressionEngine
+from system_metrics import SystemSampler, psutil
+
 class BackendUtils:
     """Utility class for backend operations"""
     
-    def __init__(self):
+    def __init__(self, sample_interval: Optional[float] = None):
         self.current_time = datetime.datetime.now()
         self.version = "1.0.0"
+        self.expression_engine = ExpressionEngine()
+        self.system_sampler = None
+        
+        if sample_interval and psutil is not None:
+            self.system_sampler = SystemSampler(sample_interval)
+            self.system_sampler.start()
         
     def calculate(self, expression: str) -> float:
         """Safely evaluate mathematical expressions"""
         try:
-            # Remove spaces and validate expression
-            expression = expression.strip().replace(' ', '')
-            
-            # Basic validation - only allow numbers, operators, and parentheses
-            allowed_chars = set('0123456789+-*/.()')
-            if not all(c in allowed_chars for c in expression):
-                raise ValueError("Invalid characters in expression")
-            
-            # Safely evaluate the expression
-            result = eval(expression)
+            # Parsed once per distinct expression; only arithmetic is compiled
+            result = self.expression_engine.evaluate(expression)
             return float(result)
             
         except ZeroDivisionError:
@@ -36,6 +37,34 @@ class BackendUtils:
         except Exception as e:
             raise ValueError(f"Calculation error: {str(e)}")
     
+    def calculate_array(self, expression: str, variables: Dict[str, Any]) -> List[Optional[float]]:
+        """Evaluate an expression over columns of variable values in one vectorized pass"""
+        try:
+            return self.expression_engine.evaluate_array(expression, variables)
+            
+        except ZeroDivisionError:
+            raise ValueError("Division by zero")
+        except (ValueError, SyntaxError) as e:
+            raise ValueError(f"Invalid expression: {str(e)}")
+        except Exception as e:
+            raise ValueError(f"Calculation error: {str(e)}")
+    
+    def calculate_many(self, expressions: List[str], variables: Optional[Dict[str, Any]] = None) -> Dict[str, List]:
+        """Evaluate several expressions, over the variable columns when given"""
+        results = []
+        errors = []
+        for expression in expressions:
+            try:
+                if variables is None:
+                    results.append(self.calculate(expression))
+                else:
+                    results.append(self.calculate_array(expression, variables))
+                errors.append(None)
+            except ValueError as e:
+                results.append(None)
+                errors.append(str(e))
+        return {"results": results, "errors": errors}
+    
     def get_weather_data(self, location: str = "Current Location") -> Dict[str, Any]:
         """Get simulated weather data"""
         # Simulate weather data
@@ -80,16 +109,37 @@ class BackendUtils:
             return [f"item_{i}" for i in range(count)]
     
     def get_system_info(self) -> Dict[str, Any]:
-        """Get system information"""
+        """Get system information from the latest background sample"""
+        sample = self.system_sampler.latest() if self.system_sampler else None
+        if sample is None:
+            # Not sampling, or the first sample is not in yet
+            now = datetime.datetime.now()
+            return {
+                "timestamp": now.isoformat(),
+                "version": self.version,
+                "status": "operational",
+                "uptime": (now - self.current_time).total_seconds(),
+                "memory_usage": None,
+                "cpu_usage": None
+            }
+        
+        sampled_at = datetime.datetime.fromtimestamp(sample['timestamp'])
         return {
-            "timestamp": self.current_time.isoformat(),
+            "timestamp": sampled_at.isoformat(),
             "version": self.version,
             "status": "operational",
-            "uptime": "Running",
-            "memory_usage": "Normal",
-            "cpu_usage": "Low"
+            "uptime": (sampled_at - self.current_time).total_seconds(),
+            "memory_usage": sample['memory_percent'],
+            "cpu_usage": sample['cpu_percent'],
+            "metrics": sample
         }
     
+    def get_system_history(self, limit: Optional[int] = None) -> Optional[Dict[str, List[float]]]:
+        """Recent metric samples as columns, oldest first; None when not sampling"""
+        if not self.system_sampler:
+            return None
+        return self.system_sampler.history(limit)
+    
     def validate_input(self, text: str, max_length: int = 1000) -> bool:
         """Validate input text"""
         if not text or not isinstance(text, str):
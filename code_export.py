@@ -0,0 +1,90 @@
+# JARVIS Code Export
+# Streams archives of generated files without building them in memory or on disk
+
+import io
+import os
+import tarfile
+import time
+import zipfile
+from datetime import datetime
+from typing import Iterable, Iterator, Tuple
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# (archive name, content, ISO timestamp)
+ExportEntry = Tuple[str, str, str]
+
+
+class StreamBuffer(io.RawIOBase):
+    """Write-only, unseekable sink whose bytes are drained as soon as they are written"""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.offset
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain"""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def unique_names(entries: Iterable[ExportEntry]) -> Iterator[ExportEntry]:
+    """Suffix repeated archive names so every member is kept"""
+    seen = {}
+    for name, content, timestamp in entries:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        if count:
+            stem, extension = os.path.splitext(name)
+            name = f"{stem}-{count + 1}{extension}"
+        yield name, content, timestamp
+
+
+def iter_zip_archive(entries: Iterable[ExportEntry]) -> Iterator[bytes]:
+    """Yield a deflated ZIP archive of the entries piece by piece"""
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content, timestamp in unique_names(entries):
+            info = zipfile.ZipInfo(name, date_time=datetime.fromisoformat(timestamp).timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as member:
+                for start in range(0, len(content), EXPORT_CHUNK_SIZE):
+                    member.write(content[start:start + EXPORT_CHUNK_SIZE].encode('utf-8'))
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def iter_tar_archive(entries: Iterable[ExportEntry]) -> Iterator[bytes]:
+    """Yield a gzipped tar archive of the entries piece by piece"""
+    buffer = StreamBuffer()
+    with tarfile.open(fileobj=buffer, mode='w|gz') as archive:
+        for name, content, timestamp in unique_names(entries):
+            data = content.encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = time.mktime(datetime.fromisoformat(timestamp).timetuple())
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(data))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+ARCHIVE_FORMATS = {
+    'zip': (iter_zip_archive, 'application/zip', 'zip'),
+    'tar': (iter_tar_archive, 'application/gzip', 'tar.gz')
+}
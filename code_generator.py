@@ -1,34 +1,404 @@
 # JARVIS Code Generator
 # AI-powered code generation engine for file creation
 
+import hashlib
 import json
+import multiprocessing
 import os
+import pickle
 import re
+import sys
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from code_export import ARCHIVE_FORMATS
+from code_store import GenerationRecord, GenerationStore, HistoryLog
+from code_validation import CodeValidator
+from file_writer import WriteBehindWriter, atomic_write
+from keyword_matcher import KeywordMatcher
+from render_cache import MemoCache, RenderCache
+from search_index import SearchIndex, make_snippet, term_counts
+from template_engine import CompiledTemplate, LazyTemplate, compile_template
+from template_index import BKTree, TemplateVectorIndex, normalize_name
+from worker_pool import START_METHOD
+
+TEMPLATE_CATEGORIES = ['web', 'backend', 'database', 'config', 'docs', 'projects']
+TEMPLATE_MANIFEST_VERSION = 2
+TEMPLATE_SNAPSHOT_VERSION = 1
+
+REQUIREMENT_KEYWORDS = {
+    'technology': {
+        'python': ['python', 'script', 'data analysis', 'machine learning'],
+        'javascript': ['javascript', 'js', 'node', 'react', 'vue', 'angular'],
+        'html': ['html', 'web page', 'website', 'html5'],
+        'css': ['css', 'styling', 'responsive', 'styles'],
+        'sql': ['database', 'sql', 'table', 'schema', 'query'],
+        'json': ['json', 'config', 'configuration', 'settings'],
+        'markdown': ['readme', 'documentation', 'docs']
+    },
+    'template_type': {
+        'basic': ['simple', 'basic', 'hello world', 'minimal'],
+        'api': ['api', 'endpoint', 'rest', 'server'],
+        'component': ['component', 'react', 'vue', 'angular'],
+        'responsive': ['responsive', 'mobile', 'tablet', 'adaptive']
+    },
+    'action': {
+        'create': ['create', 'generate', 'build', 'make', 'new']
+    },
+    'tech_term': {
+        'code': ['function', 'class', 'method', 'api', 'endpoint', 'component']
+    }
+}
+REQUIREMENT_MATCHER = KeywordMatcher(REQUIREMENT_KEYWORDS)
+RECOMMENDATION_COUNT = 5
+SUGGESTION_COUNT = 3
+SEARCH_HISTORY_PAGE = 500
+# Longest a search waits for startup indexing before answering from a partial index
+SEARCH_READY_TIMEOUT = 1.0
+NAME_PATTERN = re.compile(r'(?:called|named|for)\s+["\']?([^"\'\s,.]+)["\']?')
+WORD_RUN_PATTERN = re.compile(r'\S+')
+
 
 class CodeGenerator:
-    def __init__(self):
+    def __init__(self, watch_templates: bool = False, watch_interval: float = 2.0,
+                 lazy_templates: bool = False, snapshot_path: Optional[str] = None,
+                 render_cache_size: int = 256, render_cache_bytes: int = 32 * 1024 * 1024,
+                 render_cache_ttl: Optional[float] = None, batch_workers: Optional[int] = None,
+                 batch_use_processes: bool = False, history_max_entries: Optional[int] = 1000,
+                 history_max_bytes: Optional[int] = 64 * 1024 * 1024, history_path: Optional[str] = None,
+                 write_behind: bool = False, validation_workers: int = 2, validation_timeout: float = 5.0,
+                 analysis_cache_size: int = 1024, search_history_max: Optional[int] = 10000):
+        self.template_dir = os.path.join(os.path.dirname(__file__), 'templates')
+        self.manifest_path = os.path.join(self.template_dir, 'manifest.json')
+        self.lazy_templates = lazy_templates
+        self.snapshot_path = snapshot_path
+        self.template_files = {}
+        self.template_reload_lock = threading.Lock()
+        self.template_watcher = None
+        self.vector_index = None
+        self.vector_index_lock = threading.Lock()
+        self.name_tree = None
+        self.name_tree_lock = threading.Lock()
+        self.listeners = []
+        self.search_index = SearchIndex()
+        self.search_template_lock = threading.Lock()
+        # Lazy templates indexed without their body: id -> category
+        self.search_unloaded_bodies = {}
+        # Generation ids in the full-text index, oldest first, capped at search_history_max
+        self.search_history_max = search_history_max
+        self.search_generations = OrderedDict()
+        self.search_generations_lock = threading.Lock()
+        # Identical bodies are tokenized once
+        self.search_content_terms = MemoCache(1024)
         self.templates = self.load_templates()
-        self.generated_files = []
-        self.code_history = []
+        self.build_template_index()
+        self.render_cache = RenderCache(render_cache_size, render_cache_bytes, render_cache_ttl)
+        self.batch_workers = batch_workers
+        self.batch_use_processes = batch_use_processes
+        self.batch_executor = None
+        self.render_executor = None
+        self.batch_executor_lock = threading.Lock()
+        self.history_log = HistoryLog(history_path) if history_path else None
+        # Without a log an evicted generation can never be found again, so it leaves the search index
+        self.generation_store = GenerationStore(
+            history_max_entries, history_max_bytes,
+            on_evict=None if self.history_log else self.remove_generation_search
+        )
+        self.file_writer = WriteBehindWriter() if write_behind else None
+        self.validator = CodeValidator(validation_workers, validation_timeout)
+        self.analysis_cache = MemoCache(analysis_cache_size)
+        self.search_ready = threading.Event()
+        last_seq = 0
+        if self.history_log:
+            # Entries logged by earlier runs; later ones are indexed as they are recorded
+            newest = self.history_log.query(limit=1, descending=True, include_content=False)['entries']
+            last_seq = newest[0]['seq'] if newest else 0
+        threading.Thread(target=self.index_startup_search, args=(last_seq,),
+                         name="search-indexer", daemon=True).start()
+        
+        if watch_templates:
+            self.start_template_watcher(watch_interval)
         
     def load_templates(self) -> Dict[str, Dict]:
+        """Load code templates, from the compiled snapshot when one is configured and current"""
+        if not self.snapshot_path:
+            return self.load_template_sources()
+        
+        source_key = self.template_source_key()
+        templates = self.load_template_snapshot(source_key)
+        if templates is None:
+            templates = self.load_template_sources()
+            self.write_template_snapshot(templates, source_key)
+        return templates
+    
+    def load_template_sources(self) -> Dict[str, Dict]:
         """Load code templates from template directory"""
         templates = {}
-        template_dir = os.path.join(os.path.dirname(__file__), 'templates')
+        template_dir = self.template_dir
         
         if not os.path.exists(template_dir):
-            return self.get_default_templates()
+            return self.compile_templates(self.get_default_templates())
+        
+        if self.lazy_templates:
+            manifest_templates = self.load_template_manifest()
+            if manifest_templates:
+                return self.compile_templates(manifest_templates)
             
         # Load templates from directory structure
-        for category in ['web', 'backend', 'database', 'config', 'docs']:
+        for category in TEMPLATE_CATEGORIES:
             category_path = os.path.join(template_dir, category)
             if os.path.exists(category_path):
                 templates[category] = self.load_template_category(category_path)
+        
+        if self.lazy_templates and self.template_files:
+            # Next start only needs to read the manifest
+            self.write_template_manifest(templates)
                 
-        return templates if templates else self.get_default_templates()
+        return self.compile_templates(templates if templates else self.get_default_templates())
+    
+    def template_source_key(self) -> str:
+        """Fingerprint of every input a template snapshot was built from"""
+        sources = [
+            [path, mtime, size, category]
+            for path, (mtime, size, category) in sorted(self.scan_template_files().items())
+        ]
+        # The default templates and the compiled format live in these modules
+        for module_file in (__file__, sys.modules[CompiledTemplate.__module__].__file__):
+            stat = os.stat(module_file)
+            sources.append([os.path.abspath(module_file), stat.st_mtime_ns, stat.st_size, None])
+        return hashlib.sha256(json.dumps([TEMPLATE_SNAPSHOT_VERSION, sources]).encode('utf-8')).hexdigest()
+    
+    def load_template_snapshot(self, source_key: str) -> Optional[Dict[str, Dict]]:
+        """Load the parsed and compiled template set from the snapshot file in one read"""
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading template snapshot: {e}")
+            return None
+        
+        if snapshot.get('version') != TEMPLATE_SNAPSHOT_VERSION or snapshot.get('source_key') != source_key:
+            return None
+        self.template_files = snapshot['template_files']
+        return snapshot['templates']
+    
+    def write_template_snapshot(self, templates: Dict[str, Dict], source_key: str) -> None:
+        """Serialize the parsed and compiled template set for the next start"""
+        for category_templates in templates.values():
+            for template in category_templates.values():
+                if isinstance(template, LazyTemplate) and not template.loaded:
+                    template.load()
+        
+        snapshot = {
+            "version": TEMPLATE_SNAPSHOT_VERSION,
+            "source_key": source_key,
+            "template_files": self.template_files,
+            "templates": templates
+        }
+        try:
+            temp_path = f"{self.snapshot_path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"Error writing template snapshot: {e}")
+    
+    def load_template_manifest(self) -> Optional[Dict[str, Dict]]:
+        """Build lazy templates from the manifest without parsing any template body"""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading template manifest: {e}")
+            return None
+        
+        if manifest.get('version') != TEMPLATE_MANIFEST_VERSION:
+            return None
+        
+        # Stat-only pass: files edited, added or removed since the manifest was written
+        found = self.scan_template_files()
+        templates = {}
+        for entry in manifest['templates']:
+            template_path = os.path.join(self.template_dir, entry['file'])
+            if found.get(template_path) != (entry['mtime_ns'], entry['size'], entry['category']):
+                continue
+            metadata = {key: entry[key] for key in ('id', 'name', 'description', 'language')}
+            templates.setdefault(entry['category'], {})[entry['id']] = LazyTemplate(
+                metadata, template_path, entry['content_hash'], entry['placeholders']
+            )
+            self.template_files[template_path] = (entry['mtime_ns'], entry['size'], entry['category'], entry['id'])
+        
+        drifted = [path for path in found if path not in self.template_files]
+        for template_path in drifted:
+            loaded = self.load_template_file(template_path, found[template_path][2])
+            if loaded:
+                template_id, template_data = loaded
+                templates.setdefault(found[template_path][2], {})[template_id] = template_data
+        if drifted or len(self.template_files) != len(manifest['templates']):
+            self.write_template_manifest(templates)
+        return templates
+    
+    def write_template_manifest(self, templates: Dict[str, Dict]) -> None:
+        """Write the lightweight manifest used for lazy startup"""
+        entries = []
+        for template_path, (mtime, size, category, template_id) in self.template_files.items():
+            template = templates.get(category, {}).get(template_id)
+            if template is None:
+                continue
+            entries.append({
+                "id": template_id,
+                "category": category,
+                "file": os.path.relpath(template_path, self.template_dir),
+                "mtime_ns": mtime,
+                "size": size,
+                "name": template['name'],
+                "description": template['description'],
+                "language": template['language'],
+                "content_hash": self.template_content_hash(template),
+                "placeholders": self.template_placeholders(template)
+            })
+        
+        try:
+            temp_path = f"{self.manifest_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({"version": TEMPLATE_MANIFEST_VERSION, "templates": entries}, f)
+            os.replace(temp_path, self.manifest_path)
+        except Exception as e:
+            print(f"Error writing template manifest: {e}")
+    
+    def template_placeholders(self, template: Dict) -> List[str]:
+        """Placeholder names of a template, taken from the manifest for unloaded templates"""
+        if isinstance(template, LazyTemplate) and not template.loaded:
+            return list(template.placeholders)
+        compiled = template.get('compiled') or compile_template(template['content'])
+        return sorted(compiled.placeholders)
+    
+    def template_content_hash(self, template: Dict) -> str:
+        """Content hash of a template body, taken from the manifest for unloaded templates"""
+        if isinstance(template, LazyTemplate) and not template.loaded:
+            return template.content_hash
+        body = template['content']
+        if template['language'] == 'project':
+            # A project's body is its file list and shared parameters
+            body = json.dumps([body, template['files'], template.get('parameters', {})], sort_keys=True)
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()
+    
+    def build_template_index(self) -> None:
+        """Build the flat id lookup and the prebuilt catalog for the loaded templates"""
+        index = {}
+        catalog = {}
+        digest = hashlib.sha256()
+        for category, templates in self.templates.items():
+            entries = []
+            for template_id, template in templates.items():
+                # First category wins for duplicate ids, as in the old scan
+                index.setdefault(template_id, template)
+                entries.append({
+                    "id": template_id,
+                    "name": template['name'],
+                    "description": template['description'],
+                    "language": template['language']
+                })
+                digest.update(json.dumps(
+                    [category, template_id, template['name'], template['description'],
+                     template['language'], self.template_content_hash(template)]
+                ).encode('utf-8'))
+            catalog[category] = tuple(entries)
+        
+        self.template_index = index
+        self.template_catalog = catalog
+        self.catalog_hash = digest.hexdigest()
+        # Built in the background so neither startup nor the first analysis pays for it
+        self.vector_index = None
+        threading.Thread(target=self.get_vector_index, name="vector-indexer", daemon=True).start()
+    
+    def index_template_search(self) -> None:
+        """Replace the templates in the full-text index with the current set"""
+        with self.search_template_lock:
+            self.search_index.remove_kind('template')
+            self.search_unloaded_bodies = {}
+            for category, templates in self.templates.items():
+                for template_id, template in templates.items():
+                    if self.template_index.get(template_id) is template:
+                        self.index_template_document(template_id, template, category)
+    
+    def index_template_document(self, template_id: str, template: Dict, category: str) -> None:
+        """Add one template to the full-text index, body included once it is loaded"""
+        # dict.get does not trigger a lazy load; the body is added when the template is first rendered
+        if isinstance(template, LazyTemplate) and not template.loaded:
+            self.search_unloaded_bodies[template_id] = category
+        parts = [template_id, template['name'], template['description'], template['language'],
+                 *self.template_placeholders(template), dict.get(template, 'content') or '']
+        parts.extend(entry['path'] for entry in dict.get(template, 'files', ()))
+        self.search_index.add(('template', template_id), 'template', term_counts(' '.join(parts)), {
+            "id": template_id,
+            "name": template['name'],
+            "language": template['language'],
+            "category": category
+        })
+    
+    def get_vector_index(self) -> TemplateVectorIndex:
+        """TF-IDF index over the current templates, built once per template load"""
+        vector_index = self.vector_index
+        if vector_index is not None and vector_index.source is self.template_index:
+            return vector_index
+        # A caller arriving while the background build runs waits for it instead of building again
+        with self.vector_index_lock:
+            vector_index = self.vector_index
+            index = self.template_index
+            if vector_index is not None and vector_index.source is index:
+                return vector_index
+            vector_index = TemplateVectorIndex(
+                (
+                    {
+                        "id": template_id,
+                        "name": template['name'],
+                        "language": template['language'],
+                        "text": ' '.join([template_id, template['name'], template['description'],
+                                          template['language'], *self.template_placeholders(template)])
+                    }
+                    for template_id, template in index.items()
+                ),
+                source=index
+            )
+            self.vector_index = vector_index
+        return vector_index
+    
+    def get_name_tree(self) -> BKTree:
+        """Edit-distance tree over template ids and names, built on the first unknown-id lookup"""
+        name_tree = self.name_tree
+        if name_tree is not None and name_tree.source is self.template_index:
+            return name_tree
+        with self.name_tree_lock:
+            name_tree = self.name_tree
+            index = self.template_index
+            if name_tree is None or name_tree.source is not index:
+                name_tree = BKTree(
+                    ((name, template_id) for template_id, template in index.items()
+                     for name in (template_id, template['name'])),
+                    source=index
+                )
+                self.name_tree = name_tree
+        return name_tree
+    
+    def compile_templates(self, templates: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Pre-compile every template body so rendering is a single pass"""
+        for category_templates in templates.values():
+            for template in category_templates.values():
+                # Lazy templates compile themselves when their body is first read
+                if isinstance(template, LazyTemplate):
+                    continue
+                if 'compiled' not in template and 'content' in template:
+                    template['compiled'] = compile_template(template['content'])
+        return templates
     
     def get_default_templates(self) -> Dict[str, Dict]:
         """Default templates if template directory doesn't exist"""
@@ -733,102 +1103,641 @@ API requests are limited to {{rateLimit}} requests per minute per API key.
 
 **Generated by JARVIS AI Assistant** on {{date}}'''
                 }
+            },
+            'projects': {
+                'flask_react_starter': {
+                    'name': 'Flask + React Starter',
+                    'description': 'Flask API, React component, SQL schema, config and README',
+                    'language': 'project',
+                    'content': '',
+                    'parameters': {
+                        'endpoint': 'items',
+                        'endpoint_name': 'items',
+                        'endpointDescription': 'List and create items',
+                        'ComponentName': 'App',
+                        'componentClass': 'app',
+                        'tableName': 'items',
+                        'mainFile': 'backend/app.py'
+                    },
+                    'files': [
+                        {'path': '{{projectName}}/backend/app.py', 'template': 'python_api'},
+                        {'path': '{{projectName}}/frontend/src/{{ComponentName}}.jsx', 'template': 'react_component'},
+                        {'path': '{{projectName}}/database/schema.sql', 'template': 'sql_schema'},
+                        {'path': '{{projectName}}/config.json', 'template': 'json_config'},
+                        {'path': '{{projectName}}/.env', 'template': 'env_file'},
+                        {'path': '{{projectName}}/README.md', 'template': 'readme'}
+                    ]
+                }
             }
         }
     
     def load_template_category(self, category_path: str) -> Dict:
         """Load templates from a specific category directory"""
         templates = {}
+        category = os.path.basename(category_path)
         for file in os.listdir(category_path):
             if file.endswith('.json'):
                 template_path = os.path.join(category_path, file)
+                loaded = self.load_template_file(template_path, category)
+                if loaded:
+                    template_id, template_data = loaded
+                    templates[template_id] = template_data
+        return templates
+    
+    def load_template_file(self, template_path: str, category: str) -> Optional[tuple]:
+        """Parse one template file and record its mtime for change detection"""
+        file = os.path.basename(template_path)
+        try:
+            stat = os.stat(template_path)
+            with open(template_path, 'r') as f:
+                template_data = json.load(f)
+            template_id = template_data.get('id', file[:-5])
+            self.template_files[template_path] = (stat.st_mtime_ns, stat.st_size, category, template_id)
+            return template_id, template_data
+        except Exception as e:
+            print(f"Error loading template {file}: {e}")
+            return None
+    
+    def scan_template_files(self) -> Dict[str, tuple]:
+        """Stat every template file on disk without parsing it"""
+        found = {}
+        for category in TEMPLATE_CATEGORIES:
+            category_path = os.path.join(self.template_dir, category)
+            if not os.path.isdir(category_path):
+                continue
+            for file in os.listdir(category_path):
+                if file.endswith('.json'):
+                    template_path = os.path.join(category_path, file)
+                    try:
+                        stat = os.stat(template_path)
+                    except OSError:
+                        continue
+                    found[template_path] = (stat.st_mtime_ns, stat.st_size, category)
+        return found
+    
+    def reload_changed_templates(self) -> Dict[str, List[str]]:
+        """Reparse only the template files that changed and swap them into the live index"""
+        changes = {"updated": [], "removed": []}
+        if not self.template_reload_lock.acquire(blocking=False):
+            # Another reload is already running
+            return changes
+        try:
+            found = self.scan_template_files()
+            changed = [
+                path for path, (mtime, size, category) in found.items()
+                if self.template_files.get(path, (None, None, None))[:3] != (mtime, size, category)
+            ]
+            removed = [path for path in self.template_files if path not in found]
+            if not changed and not removed:
+                return changes
+            
+            # Copy-on-write: in-flight requests keep using the old dicts
+            if self.template_files:
+                templates = {category: dict(entries) for category, entries in self.templates.items()}
+            else:
+                templates = {}
+            
+            for path in removed:
+                _, _, category, template_id = self.template_files.pop(path)
+                templates.get(category, {}).pop(template_id, None)
+                changes["removed"].append(template_id)
+            
+            for path in changed:
+                category = found[path][2]
+                previous = self.template_files.get(path)
+                loaded = self.load_template_file(path, category)
+                if not loaded:
+                    # Keep serving the last good version of a broken file
+                    continue
+                template_id, template_data = loaded
+                if previous and previous[3] != template_id:
+                    templates.get(previous[2], {}).pop(previous[3], None)
+                templates.setdefault(category, {})[template_id] = template_data
+                changes["updated"].append(template_id)
+            
+            if not templates:
+                templates = self.get_default_templates()
+            self.templates = self.compile_templates(templates)
+            self.build_template_index()
+            self.index_template_search()
+            if self.lazy_templates and self.template_files:
+                self.write_template_manifest(self.templates)
+            if self.snapshot_path:
+                self.write_template_snapshot(self.templates, self.template_source_key())
+            self.notify('templates', {**changes, "catalog_hash": self.catalog_hash})
+            return changes
+        finally:
+            self.template_reload_lock.release()
+    
+    def start_template_watcher(self, interval: float = 2.0) -> None:
+        """Poll the templates directory for changes in a background thread"""
+        if self.template_watcher and self.template_watcher.is_alive():
+            return
+        self.template_watcher_stop = threading.Event()
+        
+        def watch():
+            while not self.template_watcher_stop.wait(interval):
                 try:
-                    with open(template_path, 'r') as f:
-                        template_data = json.load(f)
-                        templates[template_data.get('id', file[:-5])] = template_data
+                    changes = self.reload_changed_templates()
+                    if changes["updated"] or changes["removed"]:
+                        print(f"Reloaded templates: {changes}")
                 except Exception as e:
-                    print(f"Error loading template {file}: {e}")
-        return templates
+                    print(f"Error reloading templates: {e}")
+        
+        self.template_watcher = threading.Thread(target=watch, name="template-watcher", daemon=True)
+        self.template_watcher.start()
     
-    def generate_code(self, template_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def stop_template_watcher(self) -> None:
+        """Stop the background template watcher"""
+        if self.template_watcher:
+            self.template_watcher_stop.set()
+            self.template_watcher.join()
+            self.template_watcher = None
+    
+    def generate_code(self, template_id: str, parameters: Dict[str, Any], save: bool = False,
+                      autocorrect: Optional[int] = None) -> Dict[str, Any]:
         """
         Generate code based on template and parameters
         
         Args:
             template_id: ID of the template to use
             parameters: Parameters to fill in the template
+            save: Also write the generated file(s) to disk
+            autocorrect: Use the closest template id within this edit distance
+                when template_id is unknown and the match is unambiguous
             
         Returns:
-            Dictionary with generated code and metadata
+            Dictionary with generated code and metadata. An unknown template
+            gets 'suggestions'; a corrected one reports 'corrected_from'.
         """
         try:
             # Find template
-            template = self.find_template(template_id)
+            template_id, template, corrected_from = self.resolve_template(template_id, autocorrect)
             if not template:
-                return {
-                    "success": False,
-                    "error": f"Template '{template_id}' not found"
-                }
-            
-            # Generate filename
-            filename = self.generate_filename(template, parameters)
+                return self.template_not_found(template_id)
             
-            # Fill template with parameters
-            content = self.fill_template(template['content'], parameters)
+            if template['language'] == 'project':
+                result = self.generate_project(template, parameters, save)
+            else:
+                # Generate filename
+                filename = self.generate_filename(template, parameters)
+                
+                # Fill and validate, reusing an identical earlier render when cached
+                compiled, content, validation_result = self.render_template(template_id, template, parameters)
+                
+                # Create result
+                result = self.build_result(template_id, template, compiled, filename, parameters, content, validation_result)
+                
+                # Store in history
+                self.record_generation(result)
+                
+                if save:
+                    result['saved'] = self.save_file(result['id'])
             
-            # Validate generated code
-            validation_result = self.validate_code(content, template['language'])
+            if corrected_from:
+                result['corrected_from'] = corrected_from
+            return result
             
-            # Create result
-            result = {
-                "success": True,
-                "filename": filename,
-                "content": content,
-                "language": template['language'],
-                "template_used": template['name'],
-                "parameters": parameters,
-                "validation": validation_result,
-                "timestamp": datetime.now().isoformat(),
-                "id": str(uuid.uuid4())
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
             }
+    
+    def generate_project(self, template: Dict, parameters: Dict[str, Any], save: bool = False) -> Dict[str, Any]:
+        """Expand a project template into all of its files in one batch"""
+        shared = {**template.get('parameters', {}), **parameters}
+        jobs = []
+        for entry in template['files']:
+            file_parameters = {**shared, **entry.get('parameters', {})}
+            path = compile_template(entry['path']).render(file_parameters)
+            path = re.sub(r'[^\w\-\./]', '_', path)
+            if os.path.isabs(path) or '..' in path.split('/'):
+                raise ValueError(f"Project file path escapes the project: {path}")
+            jobs.append({"template_id": entry['template'], "parameters": file_parameters, "path": path})
+        
+        nested = [job['template_id'] for job in jobs
+                  if (self.find_template(job['template_id']) or {}).get('language') == 'project']
+        if nested:
+            raise ValueError(f"Project templates cannot include other projects: {nested}")
+        
+        files = self.generate_code_batch(jobs)
+        file_ids = [result['id'] for result in files if result['success']]
+        result = {
+            "success": len(file_ids) == len(files),
+            "project": True,
+            "template_used": template['name'],
+            "parameters": shared,
+            "files": files,
+            "file_ids": file_ids,
+            "timestamp": datetime.now().isoformat(),
+            "id": str(uuid.uuid4())
+        }
+        
+        if save:
+            result['saved'] = self.save_files(file_ids)
+        return result
+    
+    def build_result(self, template_id: str, template: Dict, compiled: CompiledTemplate, filename: str,
+                     parameters: Dict[str, Any], content: str, validation_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble the result dictionary for one generated file"""
+        return {
+            "success": True,
+            "filename": filename,
+            "content": content,
+            "language": template['language'],
+            "template_used": template['name'],
+            "template_id": template_id,
+            "parameters": parameters,
+            "validation": validation_result,
+            "placeholders": compiled.check_parameters(parameters),
+            "timestamp": datetime.now().isoformat(),
+            "id": str(uuid.uuid4())
+        }
+    
+    def record_generation(self, result: Dict[str, Any]) -> None:
+        """Add a generation result to the bounded history store and the durable log"""
+        self.record_generations([result])
+    
+    def record_generations(self, results: List[Dict[str, Any]]) -> None:
+        """Add several generation results, logging them in one transaction"""
+        records = [self.generation_store.add(result) for result in results]
+        if self.history_log:
+            self.history_log.append_many(records)
+        for record in records:
+            self.index_generation_search(record)
+        if records:
+            self.notify('generation', {"files": [record.to_file_dict() for record in records]})
+    
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call listener(event, data) on generations and template reloads"""
+        self.listeners.append(listener)
+    
+    def notify(self, event: str, data: Dict[str, Any]) -> None:
+        """Pass an event to every listener; a failing listener never breaks generation"""
+        for listener in self.listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                print(f"Error notifying listener: {e}")
+    
+    def index_generation_search(self, record, oldest: bool = False) -> bool:
+        """
+        Add one generated file to the full-text index
+        
+        Only the newest search_history_max generations stay indexed; adding
+        one beyond that drops the oldest. Records older than everything
+        indexed are added with oldest=True and are refused once the index is
+        full.
+        
+        Returns:
+            False when an oldest=True record was refused
+        """
+        with self.search_generations_lock:
+            full = self.search_history_max is not None and len(self.search_generations) >= self.search_history_max
+            if oldest and full:
+                return False
+        parts = [record.filename, record.relative_path or '', record.template_used, record.template_id or '',
+                 record.language, self.parameter_text(record.parameters)]
+        content_terms = self.search_content_terms.get(record.content_hash, None)
+        if content_terms is None:
+            content_terms = term_counts(record.content)
+            self.search_content_terms.put(record.content_hash, None, content_terms)
+        self.search_index.add(('generation', record.id), 'generation', term_counts(' '.join(parts)) + content_terms, {
+            "id": record.id,
+            "filename": record.filename,
+            "language": record.language,
+            "template_id": record.template_id,
+            "timestamp": record.timestamp
+        })
+        
+        with self.search_generations_lock:
+            self.search_generations[record.id] = None
+            if oldest:
+                self.search_generations.move_to_end(record.id, last=False)
+            evicted = []
+            while self.search_history_max is not None and len(self.search_generations) > self.search_history_max:
+                evicted.append(self.search_generations.popitem(last=False)[0])
+        for record_id in evicted:
+            self.search_index.remove(('generation', record_id))
+        return True
+    
+    def parameter_text(self, parameters: Dict[str, Any]) -> str:
+        """Searchable form of a generation's parameters"""
+        return ' '.join(f"{name}={value}" for name, value in parameters.items())
+    
+    def remove_generation_search(self, record) -> None:
+        """Drop an evicted generation from the full-text index"""
+        with self.search_generations_lock:
+            self.search_generations.pop(record.id, None)
+        self.search_index.remove(('generation', record.id))
+    
+    def index_startup_search(self, last_seq: int) -> None:
+        """Index the templates and, with a history log, the history logged before this run"""
+        try:
+            self.index_template_search()
+            if self.history_log:
+                self.index_history_search(last_seq)
+        except Exception as e:
+            print(f"Error building search index: {e}")
+        finally:
+            self.search_ready.set()
+    
+    def index_history_search(self, last_seq: int) -> None:
+        """Index the newest history logged before this run, up to and including last_seq, within the cap"""
+        # Newest first, behind anything this run has already recorded
+        cursor = last_seq + 1
+        while True:
+            page = self.history_log.query(cursor=cursor, limit=SEARCH_HISTORY_PAGE, descending=True)
+            for entry in page['entries']:
+                if not self.index_generation_search(GenerationRecord(entry), oldest=True):
+                    return
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+    
+    def search_code(self, query: str, limit: int = 20, kind: Optional[str] = None,
+                    language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Full-text search over templates and generated code
+        
+        Args:
+            query: Free text matched against metadata, parameters and content
+            limit: Maximum results
+            kind: 'template' or 'generation' to search only one of them
+            language: Only results in this language
             
-            # Store in history
-            self.code_history.append(result)
-            self.generated_files.append({
-                "id": result['id'],
-                "filename": filename,
-                "path": f"generated_files/{filename}",
-                "created_at": result['timestamp']
-            })
+        Returns:
+            Ranked results with a snippet around the first matching term
+        """
+        # Only waits when a search arrives while startup indexing is still running,
+        # and then not for long: a slow build answers from what is indexed so far
+        self.search_ready.wait(SEARCH_READY_TIMEOUT)
+        while True:
+            hits = self.search_index.search(query, limit, kind, language)
+            results = []
+            stale = []
+            for hit in hits:
+                key = hit.pop('key')
+                if hit['kind'] == 'template':
+                    template = self.find_template(hit['id'])
+                    if template is None:
+                        stale.append(key)
+                        continue
+                    # Snippets come from bodies already in memory; searching never loads one
+                    text = dict.get(template, 'content') or template['description']
+                else:
+                    record = self.find_generation(hit['id'])
+                    if record is None:
+                        # Evicted from memory with no durable log behind it
+                        stale.append(key)
+                        continue
+                    text = record.content
+                hit['snippet'] = make_snippet(text, query)
+                if hit['snippet'] is None and hit['kind'] == 'generation':
+                    hit['snippet'] = make_snippet(self.parameter_text(record.parameters), query)
+                results.append(hit)
+            if not stale:
+                return results
+            for key in stale:
+                self.search_index.remove(key)
+    
+    def get_search_stats(self) -> Dict[str, Any]:
+        """Size of the full-text index"""
+        return {**self.search_index.get_stats(), "history_indexed": self.search_ready.is_set()}
+    
+    def generate_code_batch(self, jobs: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Generate many files in one call, rendering and validating cache misses in parallel
+        
+        Args:
+            jobs: (template_id, parameters) pairs or dicts with those keys
+                and an optional relative output 'path'
             
-            return result
+        Returns:
+            One generate_code style result per job, in order. A failed job
+            gets a {"success": False, "error": ...} entry without affecting
+            the others.
+        """
+        results = [None] * len(jobs)
+        pending = {}
+        executor = self.get_batch_executor()
+        
+        for index, job in enumerate(jobs):
+            try:
+                path = None
+                if isinstance(job, dict):
+                    template_id, parameters = job.get('template_id'), job.get('parameters', {})
+                    path = job.get('path')
+                else:
+                    template_id, parameters = job
+                
+                template = self.find_template(template_id)
+                if not template:
+                    results[index] = self.template_not_found(template_id)
+                    continue
+                if template['language'] == 'project':
+                    results[index] = {"success": False, "error": f"Project template '{template_id}' cannot be batched"}
+                    continue
+                
+                filename = os.path.basename(path) if path else self.generate_filename(template, parameters)
+                compiled, cache_key, cached = self.lookup_render(template_id, template, parameters)
+                prepared = (template_id, template, compiled, filename, parameters, cache_key, path)
+                
+                if cached:
+                    results[index] = self.build_result(template_id, template, compiled, filename, parameters, *cached)
+                    if path:
+                        results[index]['path'] = path
+                else:
+                    pending[index] = (prepared, executor.submit(self.render_batch_job, compiled, parameters,
+                                                                template['language']))
+            except Exception as e:
+                results[index] = {"success": False, "error": str(e)}
+        
+        for index, (prepared, future) in pending.items():
+            template_id, template, compiled, filename, parameters, cache_key, path = prepared
+            try:
+                content, validation_result = future.result()
+                self.store_render(cache_key, compiled, content, validation_result)
+                results[index] = self.build_result(template_id, template, compiled, filename, parameters, content, validation_result)
+                if path:
+                    results[index]['path'] = path
+            except Exception as e:
+                results[index] = {"success": False, "error": str(e)}
+        
+        self.record_generations([result for result in results if result['success']])
+        return results
+    
+    def render_batch_job(self, compiled: CompiledTemplate, parameters: Dict[str, Any], language: str) -> tuple:
+        """Render and validate one batch job on a batch thread; validation shares the validator's cache and timeout"""
+        if self.render_executor:
+            content = self.render_executor.submit(compiled.render, parameters).result()
+        else:
+            content = compiled.render(parameters)
+        return content, self.validate_code(content, language)
+    
+    def get_batch_executor(self) -> Executor:
+        """Thread pool running batch jobs, created on first use along with the optional render process pool"""
+        with self.batch_executor_lock:
+            if self.batch_executor is None:
+                if self.batch_use_processes:
+                    # Rendering is pure Python, so separate processes sidestep the GIL
+                    self.render_executor = ProcessPoolExecutor(max_workers=self.batch_workers,
+                                                               mp_context=multiprocessing.get_context(START_METHOD))
+                self.batch_executor = ThreadPoolExecutor(max_workers=self.batch_workers,
+                                                         thread_name_prefix="code-batch")
+            return self.batch_executor
+    
+    def generate_code_stream(self, template_id: str, parameters: Dict[str, Any],
+                             chunk_size: int = 16384, autocorrect: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Generate code as a stream of content chunks
+        
+        Args:
+            template_id: ID of the template to use
+            parameters: Parameters to fill in the template
+            chunk_size: Approximate size of each yielded chunk
+            autocorrect: Edit distance for correcting an unknown template id, as for generate_code
             
-        except Exception as e:
+        Returns:
+            Metadata dictionary whose 'chunks' iterator yields the content.
+            'validation' is filled in and the history entry recorded once
+            the iterator is exhausted.
+        """
+        template_id, template, corrected_from = self.resolve_template(template_id, autocorrect)
+        if not template:
+            return self.template_not_found(template_id)
+        if template['language'] == 'project':
             return {
                 "success": False,
-                "error": str(e)
+                "error": f"Project template '{template_id}' cannot be streamed"
             }
+        
+        filename = self.generate_filename(template, parameters)
+        compiled, cache_key, cached = self.lookup_render(template_id, template, parameters)
+        
+        # The history entry; the returned metadata is the same without the body
+        record = self.build_result(template_id, template, compiled, filename, parameters, None, None)
+        result = {key: value for key, value in record.items() if key not in ('content', 'validation')}
+        if corrected_from:
+            result['corrected_from'] = corrected_from
+        
+        def chunks():
+            if cached:
+                content, validation_result = cached
+                for start in range(0, len(content), chunk_size):
+                    yield content[start:start + chunk_size]
+            else:
+                parts = []
+                for chunk in compiled.iter_render(parameters, chunk_size):
+                    parts.append(chunk)
+                    yield chunk
+                content = ''.join(parts)
+                validation_result = self.validate_code(content, template['language'])
+                self.store_render(cache_key, compiled, content, validation_result)
+            
+            result['validation'] = validation_result
+            self.record_generation({**record, "content": content, "validation": validation_result})
+        
+        result['chunks'] = chunks()
+        return result
+    
+    def render_template(self, template_id: str, template: Dict, parameters: Dict[str, Any]) -> tuple:
+        """Render and validate a template through the render cache"""
+        compiled, cache_key, cached = self.lookup_render(template_id, template, parameters)
+        if cached:
+            content, validation_result = cached
+        else:
+            content = self.fill_template(compiled, parameters)
+            validation_result = self.validate_code(content, template['language'])
+            self.store_render(cache_key, compiled, content, validation_result)
+        
+        return compiled, content, validation_result
+    
+    def lookup_render(self, template_id: str, template: Dict, parameters: Dict[str, Any]) -> tuple:
+        """(compiled, cache_key, cached) where cached is the (content, validation) of an identical earlier render or None"""
+        compiled = template.get('compiled') or compile_template(template['content'])
+        # Reading the body above loaded a lazy template; make it searchable
+        category = self.search_unloaded_bodies.pop(template_id, None)
+        if category is not None:
+            with self.search_template_lock:
+                if self.template_index.get(template_id) is template:
+                    self.index_template_document(template_id, template, category)
+        cache_key = self.render_cache_key(template_id, template, compiled, parameters)
+        cached = self.render_cache.get(cache_key, compiled) if cache_key else None
+        return compiled, cache_key, cached
+    
+    def store_render(self, cache_key: Optional[tuple], compiled: CompiledTemplate, content: str,
+                     validation_result: Dict[str, Any]) -> None:
+        """Cache a fresh render for lookup_render; renders without a key are not cached"""
+        if cache_key:
+            self.render_cache.put(cache_key, compiled, content, validation_result)
+    
+    def render_cache_key(self, template_id: str, template: Dict, compiled: CompiledTemplate,
+                         parameters: Dict[str, Any]) -> Optional[tuple]:
+        """Cache key from template id, language and a canonical hash of the parameters"""
+        try:
+            canonical = json.dumps(parameters, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+        
+        # {{date}} renders differently tomorrow, so today's date is part of the key
+        date = None
+        if 'date' in compiled.placeholders and 'date' not in parameters:
+            date = datetime.now().strftime("%Y-%m-%d")
+        
+        params_hash = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return (template_id, template['language'], params_hash, date)
+    
+    def get_render_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for the render cache"""
+        return self.render_cache.get_stats()
     
     def find_template(self, template_id: str) -> Optional[Dict]:
         """Find template by ID across all categories"""
-        for category, templates in self.templates.items():
-            if template_id in templates:
-                return templates[template_id]
-        return None
+        return self.template_index.get(template_id)
     
-    def fill_template(self, template_content: str, parameters: Dict[str, Any]) -> str:
-        """Fill template with parameters"""
-        content = template_content
-        
-        # Replace parameters
-        for key, value in parameters.items():
-            placeholder = f"{{{{{key}}}}}"
-            content = content.replace(placeholder, str(value))
+    def resolve_template(self, template_id: str, autocorrect: Optional[int] = None) -> tuple:
+        """(template_id, template, corrected_from) with an optional fuzzy fallback for unknown ids"""
+        template = self.find_template(template_id)
+        if template or autocorrect is None or not isinstance(template_id, str):
+            return template_id, template, None
         
-        # Handle special cases
-        content = content.replace("{{date}}", datetime.now().strftime("%Y-%m-%d"))
+        matches = self.get_name_tree().query(template_id, autocorrect)
+        # Only correct when the closest match is unambiguous
+        if not matches or (len(matches) > 1 and matches[1][0] == matches[0][0]):
+            return template_id, None, None
+        corrected = matches[0][1]
+        return corrected, self.find_template(corrected), template_id
+    
+    def suggest_templates(self, template_id: str, limit: int = SUGGESTION_COUNT) -> List[Dict[str, Any]]:
+        """Closest template ids and names by edit distance, for "did you mean" replies"""
+        if not isinstance(template_id, str):
+            return []
+        # Allow roughly one typo per three characters, and at least two
+        max_distance = max(2, len(normalize_name(template_id)) // 3)
+        index = self.template_index
+        return [{
+            "id": match,
+            "name": index[match]['name'],
+            "distance": distance
+        } for distance, match in self.get_name_tree().query(template_id, max_distance)[:limit] if match in index]
+    
+    def template_not_found(self, template_id: str) -> Dict[str, Any]:
+        """Error result for an unknown template, with the closest matches"""
+        return {
+            "success": False,
+            "error": f"Template '{template_id}' not found",
+            "suggestions": self.suggest_templates(template_id)
+        }
+    
+    def fill_template(self, template_content, parameters: Dict[str, Any]) -> str:
+        """Fill template with parameters"""
+        if not isinstance(template_content, CompiledTemplate):
+            template_content = compile_template(template_content)
         
-        return content
+        # Unknown placeholders stay as-is; {{date}} defaults to today
+        return template_content.render(parameters)
     
     def generate_filename(self, template: Dict, parameters: Dict[str, Any]) -> str:
         """Generate appropriate filename for the template"""
@@ -855,84 +1764,74 @@ API requests are limited to {{rateLimit}} requests per minute per API key.
         return f"{filename}{extension}"
     
     def validate_code(self, content: str, language: str) -> Dict[str, Any]:
-        """Basic validation of generated code"""
-        validation = {
-            "is_valid": True,
-            "warnings": [],
-            "errors": []
-        }
-        
-        # Basic checks based on language
-        if language == 'html':
-            if '<html' not in content.lower():
-                validation["warnings"].append("Missing HTML declaration")
-            if '<head>' not in content.lower():
-                validation["warnings"].append("Missing head section")
-                
-        elif language == 'javascript':
-            if 'function' not in content and 'const ' not in content and 'var ' not in content:
-                validation["warnings"].append("No functions or variables detected")
-                
-        elif language == 'python':
-            if 'def ' not in content and 'class ' not in content:
-                validation["warnings"].append("No functions or classes detected")
-            if 'import ' not in content and 'from ' not in content:
-                validation["warnings"].append("No imports detected")
-        
-        elif language == 'sql':
-            if 'CREATE' not in content.upper():
-                validation["warnings"].append("No CREATE statements found")
-        
-        # Set validation status
-        validation["is_valid"] = len(validation["errors"]) == 0
-        
-        return validation
+        """Syntax validation of generated code, cached by content hash"""
+        return self.validator.validate(content, language)
     
     def get_available_templates(self) -> Dict[str, List[Dict]]:
         """Get all available templates organized by category"""
-        available = {}
-        for category, templates in self.templates.items():
-            available[category] = []
-            for template_id, template in templates.items():
-                available[category].append({
-                    "id": template_id,
-                    "name": template['name'],
-                    "description": template['description'],
-                    "language": template['language']
-                })
-        return available
+        # Built once per template load; callers must not mutate it
+        return self.template_catalog
+    
+    def get_catalog_hash(self) -> str:
+        """Content hash of the current template catalog"""
+        return self.catalog_hash
     
     def get_generated_files(self) -> List[Dict]:
         """Get list of all generated files"""
-        return self.generated_files
+        return self.generation_store.files()
     
     def get_code_history(self) -> List[Dict]:
         """Get code generation history"""
-        return self.code_history
+        return self.generation_store.history()
+    
+    def find_generation(self, file_id: str):
+        """Look up a generated file in memory, falling back to the durable log"""
+        record = self.generation_store.get(file_id)
+        if record is None and self.history_log:
+            record = self.history_log.get(file_id)
+        return record
+    
+    def query_code_history(self, **filters) -> Dict[str, Any]:
+        """
+        Get one page of code generation history
+        
+        Args:
+            filters: cursor, limit, descending, language, template_id,
+                since, until and include_content, as for HistoryLog.query
+            
+        Returns:
+            Dictionary with 'entries' and 'next_cursor'
+        """
+        source = self.history_log or self.generation_store
+        return source.query(**filters)
+    
+    def query_generated_files(self, **filters) -> Dict[str, Any]:
+        """Get one page of generated files, with the same filters as query_code_history"""
+        page = self.query_code_history(**{**filters, "include_content": False})
+        files = [{
+            "id": entry['id'],
+            "filename": entry['filename'],
+            "path": f"generated_files/{entry.get('path') or entry['filename']}",
+            "created_at": entry['timestamp']
+        } for entry in page['entries']]
+        return {"entries": files, "next_cursor": page['next_cursor']}
+    
+    def get_history_stats(self) -> Dict[str, Any]:
+        """Retention usage of the generated files store"""
+        return self.generation_store.get_stats()
     
     def save_file(self, file_id: str, custom_path: str = None) -> Dict[str, Any]:
         """Save generated file to disk"""
         try:
             # Find the generated file
-            file_info = None
-            for file_data in self.generated_files:
-                if file_data['id'] == file_id:
-                    file_info = file_data
-                    break
-            
-            if not file_info:
+            record = self.find_generation(file_id)
+            if not record:
                 return {
                     "success": False,
                     "error": "File not found"
                 }
             
-            # Find the actual content
-            content = None
-            for history_item in self.code_history:
-                if history_item['id'] == file_id:
-                    content = history_item['content']
-                    break
-            
+            content = record.content
             if not content:
                 return {
                     "success": False,
@@ -943,19 +1842,37 @@ API requests are limited to {{rateLimit}} requests per minute per API key.
             if custom_path:
                 save_path = custom_path
             else:
-                save_path = file_info['path']
+                save_path = record.path
+            
+            # Skip the write when the target already holds this exact content
+            # and no queued write is about to replace it
+            pending = self.file_writer and self.file_writer.is_pending(save_path)
+            if not pending and self.file_matches(save_path, record):
+                return {
+                    "success": True,
+                    "path": save_path,
+                    "filename": record.filename,
+                    "unchanged": True
+                }
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            if self.file_writer:
+                # Acknowledge now; the background writer makes it durable
+                job_id = self.file_writer.submit(save_path, content)
+                return {
+                    "success": True,
+                    "path": save_path,
+                    "filename": record.filename,
+                    "job_id": job_id,
+                    "status": "queued"
+                }
             
-            # Write file
-            with open(save_path, 'w') as f:
-                f.write(content)
+            # Write file atomically
+            atomic_write(save_path, content)
             
             return {
                 "success": True,
                 "path": save_path,
-                "filename": file_info['filename']
+                "filename": record.filename
             }
             
         except Exception as e:
@@ -964,61 +1881,162 @@ API requests are limited to {{rateLimit}} requests per minute per API key.
                 "error": str(e)
             }
     
+    def get_save_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Durability status of a queued save"""
+        if not self.file_writer:
+            return None
+        return self.file_writer.get_status(job_id)
+    
+    def flush_saves(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued save is on disk"""
+        if not self.file_writer:
+            return True
+        return self.file_writer.flush(timeout)
+    
+    def missing_generations(self, file_ids: List[str]) -> List[str]:
+        """Ids that are neither in memory nor in the durable log"""
+        missing = [file_id for file_id in file_ids if self.generation_store.get(file_id) is None]
+        if missing and self.history_log:
+            logged = self.history_log.existing_ids(missing)
+            missing = [file_id for file_id in missing if file_id not in logged]
+        return missing
+    
+    def export_files(self, file_ids: Optional[List[str]] = None, archive_format: str = 'zip'):
+        """
+        Stream an archive of generated files
+        
+        Args:
+            file_ids: Files to include; all retained files when omitted
+            archive_format: 'zip' or 'tar' (gzipped)
+            
+        Returns:
+            Iterator of archive bytes. Each file's content is fetched only
+            when its turn comes, so memory does not grow with the export.
+        """
+        build_archive = ARCHIVE_FORMATS[archive_format][0]
+        if file_ids is None:
+            file_ids = [record.id for record in self.generation_store.snapshot()]
+        
+        def entries():
+            for file_id in file_ids:
+                record = self.find_generation(file_id)
+                if record:
+                    yield record.relative_path or record.filename, record.content, record.timestamp
+        
+        return build_archive(entries())
+    
+    def file_matches(self, path: str, record) -> bool:
+        """Check whether a file on disk already has the record's content hash"""
+        try:
+            if os.path.getsize(path) != len(record.content.encode('utf-8')):
+                return False
+            with open(path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest() == record.content_hash
+        except OSError:
+            return False
+    
+    def save_files(self, file_ids: List[str], base_dir: str = None) -> List[Dict[str, Any]]:
+        """Save several generated files, optionally under a different base directory"""
+        saved = []
+        for file_id in file_ids:
+            custom_path = None
+            if base_dir:
+                record = self.find_generation(file_id)
+                if record:
+                    custom_path = os.path.join(base_dir, record.relative_path or record.filename)
+            saved.append(self.save_file(file_id, custom_path))
+        return saved
+    
     def analyze_requirements(self, requirements: str) -> Dict[str, Any]:
         """Analyze natural language requirements to determine template and parameters"""
-        requirements_lower = requirements.lower()
-        
-        # Determine language/technology
-        technology_keywords = {
-            'python': ['python', 'script', 'data analysis', 'machine learning'],
-            'javascript': ['javascript', 'js', 'node', 'react', 'vue', 'angular'],
-            'html': ['html', 'web page', 'website', 'html5'],
-            'css': ['css', 'styling', 'responsive', 'styles'],
-            'sql': ['database', 'sql', 'table', 'schema', 'query'],
-            'json': ['json', 'config', 'configuration', 'settings'],
-            'markdown': ['readme', 'documentation', 'docs', 'readme']
-        }
+        # One pass over the text finds every keyword from every table
+        hits = REQUIREMENT_MATCHER.find_all(requirements)
         
-        detected_tech = None
-        for tech, keywords in technology_keywords.items():
-            if any(keyword in requirements_lower for keyword in keywords):
-                detected_tech = tech
-                break
+        # Determine language/technology; earlier table entries take priority
+        detected_tech = REQUIREMENT_MATCHER.first_label(hits, 'technology')
         
         # Determine template type
-        template_types = {
-            'basic': ['simple', 'basic', 'hello world', 'minimal'],
-            'api': ['api', 'endpoint', 'rest', 'server'],
-            'component': ['component', 'react', 'vue', 'angular'],
-            'responsive': ['responsive', 'mobile', 'tablet', 'adaptive']
-        }
-        
-        detected_type = 'basic'  # default
-        for template_type, keywords in template_types.items():
-            if any(keyword in requirements_lower for keyword in keywords):
-                detected_type = template_type
-                break
+        detected_type = REQUIREMENT_MATCHER.first_label(hits, 'template_type') or 'basic'
         
         # Extract parameters from requirements
         parameters = self.extract_parameters(requirements, detected_tech)
         
+        # Rank templates by similarity to the request, biased toward the detected technology
+        recommendations = self.get_vector_index().query(
+            ' '.join(filter(None, [requirements, detected_tech, detected_type])), RECOMMENDATION_COUNT
+        )
+        
         # Recommend template
         recommended_template = self.recommend_template(detected_tech, detected_type)
+        if recommended_template not in self.template_index and recommendations:
+            recommended_template = recommendations[0]['id']
         
         return {
             "detected_technology": detected_tech,
+            "technologies": REQUIREMENT_MATCHER.labels_by_position(hits, 'technology'),
             "template_type": detected_type,
             "parameters": parameters,
             "recommended_template": recommended_template,
-            "confidence": self.calculate_confidence(requirements_lower, detected_tech, detected_type)
+            "recommendations": recommendations,
+            "confidence": self.calculate_confidence(requirements, detected_tech, detected_type, hits),
+            "matches": hits
         }
     
+    def analyze_requirements_cached(self, requirements: str) -> Dict[str, Any]:
+        """
+        Analyze requirements, reusing the analysis of an earlier identical phrase
+        
+        Text is compared after collapsing whitespace and ignoring case. The
+        parameters are always re-extracted because they echo the exact
+        wording and today's date, and match offsets are mapped back onto
+        this exact input.
+        """
+        normalized = ' '.join(requirements.split())
+        # Phrases sharing a key must line up character for character so cached
+        # offsets fit all of them; where lowercasing changes the length, case counts
+        key = normalized.lower()
+        if len(key) != len(normalized):
+            key = normalized
+        # Recommendations depend on the loaded templates, so a reload invalidates
+        version = self.template_index
+        
+        analysis = self.analysis_cache.get(key, version)
+        if analysis is None:
+            analysis = self.analyze_requirements(normalized)
+            self.analysis_cache.put(key, version, analysis)
+        
+        result = {**analysis, "parameters": self.extract_parameters(requirements, analysis['detected_technology'])}
+        if normalized != requirements:
+            # Original offset of each character of the collapsed text; a collapsed
+            # whitespace run maps to its first character
+            positions = []
+            for word in WORD_RUN_PATTERN.finditer(requirements):
+                if positions:
+                    positions.append(positions[-1] + 1)
+                positions.extend(range(word.start(), word.end()))
+            try:
+                result['matches'] = [
+                    {**hit, "start": positions[hit['start']], "end": positions[hit['end'] - 1] + 1}
+                    for hit in analysis['matches']
+                ]
+            except IndexError:
+                result['matches'] = REQUIREMENT_MATCHER.find_all(requirements)
+        return result
+    
+    def analyze_requirements_batch(self, requirements_list: List[str]) -> List[Dict[str, Any]]:
+        """Analyze many requirement strings in one call through the memo cache"""
+        return [self.analyze_requirements_cached(requirements) for requirements in requirements_list]
+    
+    def get_analysis_cache_stats(self) -> Dict[str, Any]:
+        """Hit-rate counters for the requirements analysis memo"""
+        return self.analysis_cache.get_stats()
+    
     def extract_parameters(self, requirements: str, technology: str) -> Dict[str, Any]:
         """Extract parameters from natural language requirements"""
         parameters = {}
         
         # Extract name/title
-        name_matches = re.findall(r'(?:called|named|for)\s+["\']?([^"\'\s,.]+)["\']?', requirements.lower())
+        name_matches = NAME_PATTERN.findall(requirements.lower())
         if name_matches:
             parameters['name'] = name_matches[0]
             parameters['projectName'] = name_matches[0]
@@ -1082,8 +2100,12 @@ API requests are limited to {{rateLimit}} requests per minute per API key.
         
         return template_map.get(technology, {}).get(template_type, f"{technology}_{template_type}")
     
-    def calculate_confidence(self, requirements: str, technology: str, template_type: str) -> float:
+    def calculate_confidence(self, requirements: str, technology: str, template_type: str,
+                             hits: Optional[List[Dict[str, Any]]] = None) -> float:
         """Calculate confidence score for the analysis"""
+        if hits is None:
+            hits = REQUIREMENT_MATCHER.find_all(requirements)
+        matched_tables = {table for hit in hits for table, _ in hit["matches"]}
         score = 0.0
         
         # Base confidence
@@ -1093,8 +2115,7 @@ API requests are limited to {{rateLimit}} requests per minute per API key.
             score += 0.3
         
         # Check for specific keywords
-        specific_keywords = ['create', 'generate', 'build', 'make', 'new']
-        if any(keyword in requirements for keyword in specific_keywords):
+        if 'action' in matched_tables:
             score += 0.1
         
         # Check for detailed descriptions
@@ -1102,8 +2123,7 @@ API requests are limited to {{rateLimit}} requests per minute per API key.
             score += 0.1
         
         # Check for technical terms
-        tech_terms = ['function', 'class', 'method', 'api', 'endpoint', 'component']
-        if any(term in requirements for term in tech_terms):
+        if 'tech_term' in matched_tables:
             score += 0.1
         
         return min(score, 1.0)
@@ -0,0 +1,390 @@
+# JARVIS Code Store
+# Id-indexed, bounded in-memory store for generated files and their history
+
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def hash_content(content: str) -> str:
+    """Content address of a rendered body"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ContentStore:
+    """Rendered bodies kept once per content hash, with reference counts for eviction"""
+
+    def __init__(self):
+        self.contents = {}
+        self.total_bytes = 0
+
+    def add(self, content_hash: str, content: str) -> Tuple[str, int]:
+        """Take a reference; returns the shared body and the bytes newly stored"""
+        entry = self.contents.get(content_hash)
+        if entry is not None:
+            entry[1] += 1
+            return entry[0], 0
+        size = sys.getsizeof(content)
+        self.contents[content_hash] = [content, 1]
+        self.total_bytes += size
+        return content, size
+
+    def release(self, content_hash: str) -> int:
+        """Drop a reference; returns the bytes freed when the last one goes"""
+        entry = self.contents[content_hash]
+        entry[1] -= 1
+        if entry[1] > 0:
+            return 0
+        del self.contents[content_hash]
+        size = sys.getsizeof(entry[0])
+        self.total_bytes -= size
+        return size
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+
+class GenerationRecord:
+    """One generated file with the metadata needed by history and save endpoints"""
+
+    __slots__ = ('id', 'filename', 'relative_path', 'content', 'language', 'template_used',
+                 'template_id', 'parameters', 'validation', 'placeholders', 'timestamp', 'size', 'seq',
+                 'content_hash')
+
+    def __init__(self, result: Dict[str, Any]):
+        self.id = result['id']
+        self.filename = result['filename']
+        self.relative_path = result.get('path')
+        self.content = result['content']
+        self.language = result['language']
+        self.template_used = result['template_used']
+        self.template_id = result.get('template_id')
+        self.parameters = result['parameters']
+        self.validation = result['validation']
+        self.placeholders = result.get('placeholders')
+        self.timestamp = result['timestamp']
+        self.size = sys.getsizeof(self.content)
+        self.seq = result.get('seq')
+        self.content_hash = result.get('content_hash') or hash_content(self.content)
+
+    @property
+    def path(self) -> str:
+        """Default save location under generated_files/"""
+        return f"generated_files/{self.relative_path or self.filename}"
+
+    def to_history_dict(self) -> Dict[str, Any]:
+        """History entry in the same shape generate_code returns"""
+        entry = {
+            "success": True,
+            "filename": self.filename,
+            "content": self.content,
+            "language": self.language,
+            "template_used": self.template_used,
+            "template_id": self.template_id,
+            "parameters": self.parameters,
+            "validation": self.validation,
+            "placeholders": self.placeholders,
+            "timestamp": self.timestamp,
+            "id": self.id,
+            "content_hash": self.content_hash
+        }
+        if self.relative_path:
+            entry["path"] = self.relative_path
+        return entry
+
+    def to_file_dict(self) -> Dict[str, Any]:
+        """Generated file entry as listed by /api/get-generated-files"""
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "path": self.path,
+            "created_at": self.timestamp
+        }
+
+
+class GenerationStore:
+    """Insertion-ordered records indexed by id, evicting the oldest over count or byte limits
+
+    Identical bodies are shared through a ContentStore, so the byte limit
+    counts each distinct body once.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 1000, max_bytes: Optional[int] = 64 * 1024 * 1024,
+                 on_evict: Optional[Callable[[GenerationRecord], None]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.records = OrderedDict()
+        self.content_store = ContentStore()
+        self.logical_bytes = 0
+        self.evictions = 0
+        self.next_seq = 1
+        self.lock = threading.Lock()
+
+    def add(self, result: Dict[str, Any]) -> GenerationRecord:
+        """Store a generation result and enforce the retention bounds"""
+        record = GenerationRecord(result)
+        evicted_records = []
+        with self.lock:
+            record.seq = self.next_seq
+            self.next_seq += 1
+            record.content, _ = self.content_store.add(record.content_hash, record.content)
+            self.records[record.id] = record
+            self.logical_bytes += record.size
+            while self.records and (
+                (self.max_entries is not None and len(self.records) > self.max_entries)
+                or (self.max_bytes is not None and self.content_store.total_bytes > self.max_bytes)
+            ):
+                _, evicted = self.records.popitem(last=False)
+                self.content_store.release(evicted.content_hash)
+                self.logical_bytes -= evicted.size
+                self.evictions += 1
+                evicted_records.append(evicted)
+        if self.on_evict:
+            for evicted in evicted_records:
+                self.on_evict(evicted)
+        return record
+
+    def get(self, record_id: str) -> Optional[GenerationRecord]:
+        """Look up a record by id"""
+        return self.records.get(record_id)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def snapshot(self) -> List[GenerationRecord]:
+        """Records oldest first, copied so callers can iterate without the lock"""
+        with self.lock:
+            return list(self.records.values())
+
+    def history(self) -> List[Dict[str, Any]]:
+        """Full history entries, oldest first"""
+        return [record.to_history_dict() for record in self.snapshot()]
+
+    def files(self) -> List[Dict[str, Any]]:
+        """Generated file entries, oldest first"""
+        return [record.to_file_dict() for record in self.snapshot()]
+
+    def query(self, cursor: Optional[int] = None, limit: int = 50, descending: bool = False,
+              language: Optional[str] = None, template_id: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              include_content: bool = True) -> Dict[str, Any]:
+        """One page of retained history, with the same arguments as HistoryLog.query"""
+        records = self.snapshot()
+        if descending:
+            records.reverse()
+
+        entries = []
+        next_cursor = None
+        for record in records:
+            if cursor is not None and (record.seq >= cursor if descending else record.seq <= cursor):
+                continue
+            if (language is not None and record.language != language) \
+                    or (template_id is not None and record.template_id != template_id) \
+                    or (since is not None and record.timestamp < since) \
+                    or (until is not None and record.timestamp > until):
+                continue
+            if len(entries) == limit:
+                next_cursor = entries[-1]["seq"]
+                break
+            entry = record.to_history_dict()
+            entry["seq"] = record.seq
+            if not include_content:
+                del entry["content"]
+            entries.append(entry)
+        return {"entries": entries, "next_cursor": next_cursor}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current usage against the retention bounds"""
+        return {
+            "entries": len(self.records),
+            "unique_contents": len(self.content_store),
+            "bytes": self.content_store.total_bytes,
+            "logical_bytes": self.logical_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions
+        }
+
+
+class HistoryLog:
+    """Durable append-only generation history in SQLite, paged by sequence number"""
+
+    METADATA_COLUMNS = ('seq', 'id', 'filename', 'relative_path', 'language', 'template_used',
+                        'template_id', 'parameters', 'validation', 'placeholders', 'timestamp', 'content_hash')
+    CONTENT_COLUMN = "COALESCE(contents.content, history.content)"
+    CONTENT_JOIN = "LEFT JOIN contents ON contents.hash = history.content_hash"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                filename TEXT NOT NULL,
+                relative_path TEXT,
+                language TEXT,
+                template_used TEXT,
+                template_id TEXT,
+                parameters TEXT,
+                validation TEXT,
+                placeholders TEXT,
+                timestamp TEXT NOT NULL,
+                content TEXT
+            );
+            CREATE TABLE IF NOT EXISTS contents (
+                hash TEXT PRIMARY KEY,
+                content TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS history_language ON history (language, seq);
+            CREATE INDEX IF NOT EXISTS history_template ON history (template_id, seq);
+            CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+        """)
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(history)")]
+        if 'content_hash' not in columns:
+            # Logs written before deduplication keep their inline content
+            self.connection.execute("ALTER TABLE history ADD COLUMN content_hash TEXT")
+        self.connection.commit()
+
+    def append(self, record: GenerationRecord) -> None:
+        """Append one record"""
+        self.append_many([record])
+
+    def append_many(self, records: List[GenerationRecord]) -> None:
+        """Append records in a single transaction, storing each distinct body once"""
+        rows = [
+            (record.id, record.filename, record.relative_path, record.language, record.template_used,
+             record.template_id, json.dumps(record.parameters, default=str), json.dumps(record.validation),
+             json.dumps(record.placeholders), record.timestamp, record.content_hash)
+            for record in records
+        ]
+        contents = {record.content_hash: record.content for record in records}
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO contents (hash, content) VALUES (?, ?)", contents.items()
+            )
+            self.connection.executemany("""
+                INSERT OR IGNORE INTO history (id, filename, relative_path, language, template_used,
+                    template_id, parameters, validation, placeholders, timestamp, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            self.connection.commit()
+
+    def get(self, record_id: str) -> Optional[GenerationRecord]:
+        """Load a record by id, including its content"""
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT {self.select_columns(True)} FROM history {self.CONTENT_JOIN} WHERE history.id = ?",
+                (record_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return GenerationRecord(self.row_to_entry(row, True))
+
+    def existing_ids(self, record_ids: List[str]) -> set:
+        """Which of the given ids are in the log, without loading any content"""
+        found = set()
+        with self.lock:
+            # Stay well under SQLite's bound parameter limit
+            for start in range(0, len(record_ids), 500):
+                chunk = record_ids[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = self.connection.execute(
+                    f"SELECT id FROM history WHERE id IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def query(self, cursor: Optional[int] = None, limit: int = 50, descending: bool = False,
+              language: Optional[str] = None, template_id: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              include_content: bool = True) -> Dict[str, Any]:
+        """
+        Return one page of history entries
+
+        Args:
+            cursor: Sequence number returned as next_cursor by the previous page
+            limit: Maximum entries in the page
+            descending: Newest entries first
+            language, template_id: Exact-match filters
+            since, until: Inclusive ISO timestamp bounds
+            include_content: False returns metadata only
+
+        Returns:
+            Dictionary with 'entries' and 'next_cursor' (None on the last page)
+        """
+        conditions = []
+        arguments = []
+        if cursor is not None:
+            conditions.append("seq < ?" if descending else "seq > ?")
+            arguments.append(cursor)
+        for column, value in (('language', language), ('template_id', template_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                arguments.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            arguments.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            arguments.append(until)
+
+        join = self.CONTENT_JOIN if include_content else ''
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        order = 'DESC' if descending else 'ASC'
+        # One extra row tells us whether another page exists
+        sql = f"SELECT {self.select_columns(include_content)} FROM history {join} {where} ORDER BY seq {order} LIMIT ?"
+        with self.lock:
+            rows = self.connection.execute(sql, (*arguments, limit + 1)).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "entries": [self.row_to_entry(row, include_content) for row in rows],
+            "next_cursor": rows[-1][0] if has_more else None
+        }
+
+    def select_columns(self, include_content: bool) -> str:
+        """Column list qualified for queries that may join the contents table"""
+        columns = [f"history.{column}" for column in self.METADATA_COLUMNS]
+        if include_content:
+            columns.append(self.CONTENT_COLUMN)
+        return ', '.join(columns)
+
+    def row_to_entry(self, row: tuple, include_content: bool) -> Dict[str, Any]:
+        """Convert a row back into the history entry shape"""
+        (seq, record_id, filename, relative_path, language, template_used,
+         template_id, parameters, validation, placeholders, timestamp, content_hash) = row[:12]
+        entry = {
+            "success": True,
+            "filename": filename,
+            "language": language,
+            "template_used": template_used,
+            "template_id": template_id,
+            "parameters": json.loads(parameters),
+            "validation": json.loads(validation),
+            "placeholders": json.loads(placeholders),
+            "timestamp": timestamp,
+            "id": record_id,
+            "seq": seq
+        }
+        if content_hash:
+            entry["content_hash"] = content_hash
+        if include_content:
+            entry["content"] = row[12]
+        if relative_path:
+            entry["path"] = relative_path
+        return entry
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self.lock:
+            self.connection.close()
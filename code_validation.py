@@ -0,0 +1,271 @@
+# JARVIS Code Validation
+# Syntax validators for generated code, run in a bounded process pool with timeouts
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+from worker_pool import WorkerPool
+
+HTML_VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+})
+# Elements whose end tag may be omitted
+HTML_OPTIONAL_END = frozenset({
+    'html', 'head', 'body', 'p', 'li', 'dt', 'dd', 'tr', 'td', 'th', 'thead', 'tbody',
+    'tfoot', 'option', 'optgroup', 'colgroup', 'caption', 'rt', 'rp'
+})
+BRACKET_PAIRS = {')': '(', ']': '[', '}': '{'}
+
+# Previous significant characters after which '/' starts a JavaScript regex literal.
+# '<' and '>' are left out so JSX closing tags are not read as regexes.
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%~^') | {''}
+# Keywords after which '/' starts a regex literal rather than a division
+JS_REGEX_KEYWORDS = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await'
+})
+
+HTML_DECLARATION = re.compile(r'<html', re.IGNORECASE)
+HTML_HEAD = re.compile(r'<head>', re.IGNORECASE)
+SQL_CREATE = re.compile(r'CREATE', re.IGNORECASE)
+
+
+def new_validation() -> Dict[str, Any]:
+    """Empty validation result"""
+    return {"is_valid": True, "warnings": [], "errors": []}
+
+
+def line_of(content: str, position: int) -> int:
+    """1-based line number of a character offset"""
+    return content.count('\n', 0, position) + 1
+
+
+def scan_brackets(content: str, line_comment: Optional[str], block_comments: bool,
+                  quotes: str, regex_literals: bool = False) -> List[str]:
+    """
+    Tokenizer-level check for unterminated strings/comments and unbalanced brackets
+
+    Strings and comments are skipped so brackets inside them are not counted.
+    """
+    errors = []
+    stack: List[Tuple[str, int]] = []
+    previous = ''
+    position = 0
+    length = len(content)
+
+    while position < length:
+        char = content[position]
+
+        if line_comment and content.startswith(line_comment, position):
+            end = content.find('\n', position)
+            position = length if end == -1 else end
+            continue
+
+        if block_comments and content.startswith('/*', position):
+            end = content.find('*/', position + 2)
+            if end == -1:
+                errors.append(f"Unterminated comment starting on line {line_of(content, position)}")
+                break
+            position = end + 2
+            continue
+
+        is_regex = regex_literals and char == '/' and previous in JS_REGEX_PRECEDERS
+        if char in quotes or is_regex:
+            start = position
+            position += 1
+            in_class = False
+            while position < length:
+                current = content[position]
+                if current == '\\':
+                    position += 2
+                    continue
+                if is_regex and current == '[':
+                    in_class = True
+                elif is_regex and current == ']':
+                    in_class = False
+                elif current == char and not in_class:
+                    break
+                elif current == '\n' and (is_regex or char != '`'):
+                    position = length
+                    break
+                position += 1
+            if position >= length:
+                kind = "regular expression" if is_regex else "string"
+                errors.append(f"Unterminated {kind} starting on line {line_of(content, start)}")
+                break
+            position += 1
+            previous = 'a'
+            continue
+
+        if char in '([{':
+            stack.append((char, position))
+        elif char in BRACKET_PAIRS:
+            if not stack or stack[-1][0] != BRACKET_PAIRS[char]:
+                errors.append(f"Unexpected '{char}' on line {line_of(content, position)}")
+                break
+            stack.pop()
+
+        if char.isalnum() or char in '_$':
+            end = position + 1
+            while end < length and (content[end].isalnum() or content[end] in '_$'):
+                end += 1
+            previous = '' if content[position:end] in JS_REGEX_KEYWORDS else 'a'
+            position = end
+            continue
+
+        if not char.isspace():
+            previous = char
+        position += 1
+
+    if not errors:
+        for opener, opened_at in stack[-3:]:
+            errors.append(f"Unclosed '{opener}' opened on line {line_of(content, opened_at)}")
+    return errors
+
+
+class TagBalanceParser(HTMLParser):
+    """Tracks open HTML elements and reports mismatched or unclosed tags"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[Tuple[str, int]] = []
+        self.errors: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag not in HTML_VOID_ELEMENTS:
+            self.stack.append((tag, self.getpos()[0]))
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in HTML_VOID_ELEMENTS:
+            return
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                for unclosed, line in self.stack[index + 1:]:
+                    if unclosed in HTML_OPTIONAL_END:
+                        continue
+                    self.errors.append(f"<{unclosed}> opened on line {line} is not closed before </{tag}>")
+                del self.stack[index:]
+                return
+        self.errors.append(f"Unexpected </{tag}> on line {self.getpos()[0]}")
+
+
+def validate_content(content: str, language: str) -> Dict[str, Any]:
+    """Validate generated code for its language; pure so it can run in worker processes"""
+    validation = new_validation()
+    errors = validation["errors"]
+    warnings = validation["warnings"]
+
+    if language == 'html':
+        if not HTML_DECLARATION.search(content):
+            warnings.append("Missing HTML declaration")
+        if not HTML_HEAD.search(content):
+            warnings.append("Missing head section")
+        parser = TagBalanceParser()
+        parser.feed(content)
+        parser.close()
+        errors.extend(parser.errors)
+        for tag, line in parser.stack:
+            if tag in HTML_OPTIONAL_END:
+                continue
+            errors.append(f"<{tag}> opened on line {line} is never closed")
+
+    elif language == 'python':
+        try:
+            compile(content, '<generated>', 'exec', dont_inherit=True)
+        except SyntaxError as e:
+            errors.append(f"Syntax error on line {e.lineno}: {e.msg}")
+        if 'def ' not in content and 'class ' not in content:
+            warnings.append("No functions or classes detected")
+        if 'import ' not in content and 'from ' not in content:
+            warnings.append("No imports detected")
+
+    elif language == 'json':
+        try:
+            json.loads(content)
+        except ValueError as e:
+            errors.append(f"Invalid JSON: {e}")
+
+    elif language == 'javascript':
+        # Without a real parser, JSX text and some regex contexts can fool the
+        # tokenizer, so its findings are advisory
+        warnings.extend(scan_brackets(content, '//', True, '\'"`', regex_literals=True))
+        if 'function' not in content and 'const ' not in content and 'var ' not in content:
+            warnings.append("No functions or variables detected")
+
+    elif language == 'css':
+        errors.extend(scan_brackets(content, None, True, '\'"'))
+
+    elif language == 'sql':
+        errors.extend(scan_brackets(content, '--', True, '\'"'))
+        if not SQL_CREATE.search(content):
+            warnings.append("No CREATE statements found")
+
+    validation["is_valid"] = len(errors) == 0
+    return validation
+
+
+class CodeValidator:
+    """Runs validate_content with a result cache, sending large content to worker processes
+
+    Content up to inline_max_bytes is validated in the calling thread, which
+    is bounded by its size. Larger content goes to the worker pool and the
+    caller waits at most timeout seconds in total before getting a "skipped"
+    result.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 5.0, inline_max_bytes: int = 16 * 1024,
+                 cache_size: int = 1024, max_pending: Optional[int] = None):
+        self.workers = workers
+        self.timeout = timeout
+        self.inline_max_bytes = inline_max_bytes
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.pool = WorkerPool(workers, timeout, max_pending)
+
+    def validate(self, content: str, language: str) -> Dict[str, Any]:
+        """Validate content, reusing the result for identical content"""
+        key = (hashlib.sha256(content.encode('utf-8')).hexdigest(), language)
+        with self.cache_lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return cached
+
+        if len(content) <= self.inline_max_bytes or self.workers <= 0:
+            validation = validate_content(content, language)
+        else:
+            validation = self.validate_in_pool(content, language)
+            if validation is None:
+                # Timed out or pool saturated: report it without caching
+                validation = new_validation()
+                validation["warnings"].append("Validation skipped: validator timed out or busy")
+                return validation
+
+        with self.cache_lock:
+            self.cache[key] = validation
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return validation
+
+    def validate_in_pool(self, content: str, language: str) -> Optional[Dict[str, Any]]:
+        """Run one validation in the worker pool; None if it timed out or the pool is saturated"""
+        try:
+            return self.pool.run(validate_content, content, language)
+        except TimeoutError:
+            return None
+
+    def start(self) -> None:
+        """Start the worker processes ahead of the first large validation"""
+        if self.workers > 0:
+            self.pool.start()
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        self.pool.close()
@@ -0,0 +1,139 @@
+# JARVIS Event Stream
+# One shared producer fanning server-sent events out to bounded, coalescing per-client queues
+
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+HEARTBEAT_INTERVAL = 15.0
+
+
+def format_event(event_id: int, event: str, data: Any) -> str:
+    """One server-sent events frame"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class Subscription:
+    """A client's pending frames; replaceable events keep only their latest frame"""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = OrderedDict()
+        self.queued = 0
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, key: Any, frame: str, replace: bool = False) -> None:
+        """
+        Queue a frame for the client
+
+        A replaceable frame supersedes a queued one with the same key, so a
+        slow reader only ever sees the newest value. Other frames are kept in
+        order up to max_pending, after which the oldest are dropped.
+        """
+        with self.condition:
+            if replace:
+                self.pending.pop(('latest', key), None)
+                self.pending[('latest', key)] = frame
+            else:
+                self.pending[('event', key)] = frame
+                self.queued += 1
+                while self.queued > self.max_pending:
+                    oldest = next(pending_key for pending_key in self.pending if pending_key[0] == 'event')
+                    del self.pending[oldest]
+                    self.queued -= 1
+                    self.dropped += 1
+            self.condition.notify()
+
+    def take(self, timeout: float) -> List[str]:
+        """Wait up to timeout for frames and return all of them"""
+        with self.condition:
+            if not self.pending and not self.closed:
+                self.condition.wait(timeout)
+            frames = list(self.pending.values())
+            self.pending.clear()
+            self.queued = 0
+            if self.dropped:
+                frames.insert(0, f"event: dropped\ndata: {json.dumps({'count': self.dropped})}\n\n")
+                self.dropped = 0
+            return frames
+
+    def close(self) -> None:
+        """Wake the reader so it can finish"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+
+class EventBroadcaster:
+    """Fans events out to every subscriber, serializing each event once"""
+
+    def __init__(self, max_subscribers: int = 100, max_pending: int = 64):
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        # Latest frame of each replaceable event, sent to new subscribers first
+        self.latest: Dict[str, str] = {}
+        self.published = 0
+
+    def subscribe(self) -> Optional[Subscription]:
+        """Register a client; None when at capacity"""
+        subscription = Subscription(self.max_pending)
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return None
+            self.subscribers.add(subscription)
+            for event, frame in self.latest.items():
+                subscription.offer(event, frame, replace=True)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a client"""
+        with self.lock:
+            self.subscribers.discard(subscription)
+        subscription.close()
+
+    def publish(self, event: str, data: Any, replace: bool = False) -> None:
+        """
+        Send an event to every subscriber
+
+        Args:
+            event: SSE event name
+            data: JSON-serializable payload
+            replace: Newer events of this name supersede queued older ones,
+                as for periodic metric samples
+        """
+        event_id = next(self.ids)
+        frame = format_event(event_id, event, data)
+        key = event if replace else event_id
+        with self.lock:
+            if replace:
+                self.latest[event] = frame
+            subscribers = list(self.subscribers)
+            self.published += 1
+        for subscription in subscribers:
+            subscription.offer(key, frame, replace)
+
+    def stream(self, subscription: Subscription, heartbeat: float = HEARTBEAT_INTERVAL):
+        """Yield SSE text for one client until it disconnects"""
+        try:
+            while not subscription.closed:
+                frames = subscription.take(heartbeat)
+                # A comment line keeps proxies from closing an idle connection
+                yield ''.join(frames) if frames else ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Subscriber count and events published"""
+        with self.lock:
+            return {
+                "subscribers": len(self.subscribers),
+                "max_subscribers": self.max_subscribers,
+                "published": self.published
+            }
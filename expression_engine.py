@@ -0,0 +1,263 @@
+# JARVIS Expression Engine
+# Arithmetic expressions parsed once into closure trees, folded and cached by normalized text,
+# with static cost limits, a worker process timeout and vectorized evaluation over columns
+
+import ast
+import math
+import operator
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from render_cache import MemoCache
+from worker_pool import WorkerBusyError, WorkerPool, WorkerTimeoutError
+
+try:
+    import numpy as np
+except ImportError:
+    # Array evaluation falls back to one row at a time
+    np = None
+
+ALLOWED_CHARACTERS = frozenset('0123456789+-*/.()')
+# Variable names are only accepted by array evaluation
+NAME_CHARACTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+
+# Cost limits, checked before any arithmetic that could exceed them runs
+MAX_EXPRESSION_LENGTH = 1024
+MAX_NODES = 256
+MAX_EXPONENT = 10000
+MAX_INTEGER_BITS = 4096
+MAX_ARRAY_LENGTH = 1000000
+
+
+def check_integer(value: Any) -> Any:
+    """Reject integer operands wider than MAX_INTEGER_BITS"""
+    if isinstance(value, int) and value.bit_length() > MAX_INTEGER_BITS:
+        raise ValueError(f"Number too large (max {MAX_INTEGER_BITS} bits)")
+    return value
+
+
+def checked_multiply(left: Any, right: Any) -> Any:
+    """Multiply, refusing integer products wider than MAX_INTEGER_BITS"""
+    if isinstance(left, int) and isinstance(right, int) \
+            and left.bit_length() + right.bit_length() > MAX_INTEGER_BITS + 1:
+        raise ValueError(f"Number too large (max {MAX_INTEGER_BITS} bits)")
+    return left * right
+
+
+def checked_power(base: Any, exponent: Any) -> Any:
+    """Raise to a power, refusing huge exponents and integer results wider than MAX_INTEGER_BITS"""
+    if isinstance(base, (int, float)) and abs(base) in (0, 1):
+        return base ** exponent
+    if isinstance(exponent, (int, float)) and abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"Exponent too large (max {MAX_EXPONENT})")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 \
+            and (base.bit_length() - 1) * exponent > MAX_INTEGER_BITS:
+        raise ValueError(f"Number too large (max {MAX_INTEGER_BITS} bits)")
+    return base ** exponent
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: checked_multiply,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: checked_power
+}
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+
+def normalize_expression(expression: str, allow_names: bool = False) -> str:
+    """Cache key form of an expression: spaces removed, characters checked"""
+    expression = expression.strip().replace(' ', '')
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression too long (max {MAX_EXPRESSION_LENGTH} characters)")
+    allowed = ALLOWED_CHARACTERS | NAME_CHARACTERS if allow_names else ALLOWED_CHARACTERS
+    if not all(char in allowed for char in expression):
+        raise ValueError("Invalid characters in expression")
+    return expression
+
+
+def fold_node(node: ast.AST) -> ast.expr:
+    """Check one AST node and replace every subtree whose operands are all constants by its value"""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        check_integer(node.value)
+        return node
+
+    if isinstance(node, ast.Name):
+        return node
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        operand = fold_node(node.operand)
+        if isinstance(operand, ast.Constant):
+            return ast.Constant(UNARY_OPERATORS[type(node.op)](operand.value))
+        return ast.UnaryOp(node.op, operand)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left = fold_node(node.left)
+        right = fold_node(node.right)
+        if isinstance(left, ast.Constant) and isinstance(right, ast.Constant):
+            try:
+                return ast.Constant(check_integer(BINARY_OPERATORS[type(node.op)](left.value, right.value)))
+            except ArithmeticError:
+                # Leave it to evaluation so the error surfaces on every call
+                pass
+        return ast.BinOp(left, node.op, right)
+
+    raise ValueError(f"Unsupported element '{type(node).__name__}'")
+
+
+def fold_source(source: str) -> ast.expr:
+    """Parse, check and constant-fold a normalized expression; module level so worker processes can run it"""
+    tree = ast.parse(source, mode='eval')
+    nodes = sum(1 for node in ast.walk(tree.body) if isinstance(node, ast.expr))
+    if nodes > MAX_NODES:
+        raise ValueError(f"Expression too complex (max {MAX_NODES} terms)")
+    return fold_node(tree.body)
+
+
+def compile_node(node: ast.expr) -> Callable[[Mapping[str, Any]], Any]:
+    """Closure evaluating a folded node against a mapping of variable values"""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda variables: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        def lookup(variables: Mapping[str, Any]) -> Any:
+            try:
+                return variables[name]
+            except KeyError:
+                raise ValueError(f"Unknown variable '{name}'") from None
+        return lookup
+
+    if isinstance(node, ast.UnaryOp):
+        apply = UNARY_OPERATORS[type(node.op)]
+        operand = compile_node(node.operand)
+        return lambda variables: apply(operand(variables))
+
+    apply = BINARY_OPERATORS[type(node.op)]
+    left = compile_node(node.left)
+    right = compile_node(node.right)
+    return lambda variables: apply(left(variables), right(variables))
+
+
+class CompiledExpression:
+    """A folded expression compiled to a closure tree"""
+
+    __slots__ = ('source', 'evaluate', 'variables')
+
+    def __init__(self, source: str, tree: ast.expr):
+        self.source = source
+        self.evaluate = compile_node(tree)
+        self.variables = tuple(sorted({node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}))
+
+    def __call__(self, variables: Optional[Mapping[str, Any]] = None) -> Any:
+        return self.evaluate(variables or {})
+
+
+def finite_or_none(value: float) -> Optional[float]:
+    """JSON-safe number: infinities and NaN become None"""
+    return value if math.isfinite(value) else None
+
+
+class ExpressionEngine:
+    """Compiles arithmetic expressions once and keeps the compiled forms in an LRU
+
+    New expressions are checked and constant-folded in a worker process with
+    a hard timeout, so even a cost the static limits miss cannot stall a
+    request. Cached expressions are answered in the calling thread.
+    """
+
+    def __init__(self, cache_size: int = 1024, workers: int = 1, timeout: float = 1.0,
+                 max_pending: int = None):
+        self.cache = MemoCache(cache_size)
+        self.workers = workers
+        self.timeout = timeout
+        self.pool = WorkerPool(workers, timeout, max_pending)
+
+    def compile(self, expression: str, allow_names: bool = False) -> CompiledExpression:
+        """Compiled form of an expression, from the cache when seen before"""
+        source = normalize_expression(expression, allow_names)
+        compiled = self.cache.get(source, None)
+        if compiled is None:
+            compiled = CompiledExpression(source, self.fold_in_pool(source))
+            self.cache.put(source, None, compiled)
+        return compiled
+
+    def evaluate(self, expression: str) -> Any:
+        """Evaluate an arithmetic expression"""
+        return self.compile(expression)()
+
+    def evaluate_array(self, expression: str, columns: Mapping[str, Any]) -> List[Optional[float]]:
+        """
+        Evaluate an expression over columns of variable values
+
+        Args:
+            expression: Arithmetic expression using variable names
+            columns: {name: list of numbers or a single number}; lists must
+                share one length and single numbers are broadcast
+
+        Returns:
+            One float per row; None where the result is not finite
+        """
+        compiled = self.compile(expression, allow_names=True)
+        missing = [name for name in compiled.variables if name not in columns]
+        if missing:
+            raise ValueError(f"Missing values for: {', '.join(missing)}")
+
+        lengths = {len(values) for name, values in columns.items()
+                   if name in compiled.variables and isinstance(values, (list, tuple))}
+        if len(lengths) > 1:
+            raise ValueError("Variable columns must all have the same length")
+        length = lengths.pop() if lengths else 1
+        if length > MAX_ARRAY_LENGTH:
+            raise ValueError(f"Too many values (max {MAX_ARRAY_LENGTH})")
+
+        if np is not None:
+            arrays = {name: np.atleast_1d(np.asarray(columns[name], dtype=np.float64))
+                      for name in compiled.variables}
+            # Everything runs in float64, so no operation can grow without bound
+            with np.errstate(all='ignore'):
+                result = np.asarray(compiled(arrays), dtype=np.float64)
+            result = np.broadcast_to(result, (length,))
+            if np.isfinite(result).all():
+                return result.tolist()
+            return [finite_or_none(value) for value in result.tolist()]
+
+        rows = []
+        for index in range(length):
+            row = {name: float(values[index] if isinstance(values, (list, tuple)) else values)
+                   for name, values in columns.items() if name in compiled.variables}
+            try:
+                rows.append(finite_or_none(float(compiled(row))))
+            except ArithmeticError:
+                rows.append(None)
+        return rows
+
+    def fold_in_pool(self, source: str) -> ast.expr:
+        """Fold in the worker pool, killing the worker if it overruns the timeout"""
+        if self.workers <= 0:
+            return fold_source(source)
+        try:
+            return self.pool.run(fold_source, source)
+        except WorkerBusyError:
+            raise TimeoutError("Calculator is busy") from None
+        except WorkerTimeoutError:
+            raise TimeoutError(f"Calculation timed out after {self.timeout} seconds") from None
+
+    def start(self) -> None:
+        """Start the worker processes ahead of the first new expression"""
+        if self.workers > 0:
+            self.pool.start()
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        self.pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compiled expression cache counters and timeouts"""
+        return {**self.cache.get_stats(), "timeouts": self.pool.timeouts}
@@ -0,0 +1,189 @@
+# JARVIS File Writer
+# Atomic file writes and a write-behind queue for saving generated files
+
+import atexit
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def open_temp_file(path: str) -> tuple:
+    """Create a temp file next to path, with normal umask-based permissions"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    return fd, temp_path
+
+
+def atomic_write(path: str, content: str, fsync: bool = True) -> None:
+    """Write a file through a temp file and os.replace so readers never see a partial file"""
+    fd, temp_path = open_temp_file(path)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def fsync_directory(directory: str) -> None:
+    """Persist a rename by syncing its directory entry"""
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WriteBehindWriter:
+    """Background writer that coalesces saves per path and fsyncs in batches"""
+
+    def __init__(self, max_jobs: int = 10000):
+        self.max_jobs = max_jobs
+        self.pending = OrderedDict()
+        self.jobs = OrderedDict()
+        self.condition = threading.Condition()
+        self.writing = 0
+        self.in_flight = set()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, name="write-behind", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, path: str, content: str) -> str:
+        """Queue a write and return its job id without touching the disk"""
+        job_id = str(uuid.uuid4())
+        key = os.path.abspath(path)
+        with self.condition:
+            if self.stopped:
+                raise RuntimeError("Writer is closed")
+            previous = self.pending.pop(key, None)
+            if previous:
+                # Only the newest content for a path is ever written
+                self.update_job(previous[0], status="coalesced", replaced_by=job_id)
+            self.pending[key] = (job_id, content)
+            self.record_job(job_id, path)
+            self.condition.notify()
+        return job_id
+
+    def is_pending(self, path: str) -> bool:
+        """Whether a write to this path is queued or in progress"""
+        key = os.path.abspath(path)
+        with self.condition:
+            return key in self.pending or key in self.in_flight
+
+    def record_job(self, job_id: str, path: str) -> None:
+        """Track a new job, forgetting the oldest statuses past max_jobs; caller holds the lock"""
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "path": path,
+            "status": "queued",
+            "queued_at": datetime.now().isoformat()
+        }
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+
+    def update_job(self, job_id: str, **fields) -> None:
+        """Update a tracked job's status; caller holds the lock"""
+        job = self.jobs.get(job_id)
+        if job:
+            job.update(fields)
+
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a save job: queued, durable, coalesced or failed"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def run(self) -> None:
+        """Drain the queue, writing each batch and syncing it together"""
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if not self.pending and self.stopped:
+                    return
+                batch = list(self.pending.items())
+                self.pending.clear()
+                self.writing = len(batch)
+                self.in_flight = {path for path, _ in batch}
+
+            results = self.write_batch(batch)
+
+            with self.condition:
+                for job_id, fields in results:
+                    self.update_job(job_id, **fields)
+                self.writing = 0
+                self.in_flight = set()
+                self.condition.notify_all()
+
+    def write_batch(self, batch: List[tuple]) -> List[tuple]:
+        """Write temp files, fsync them together, rename, then sync each directory once"""
+        results = []
+        staged = []
+        for path, (job_id, content) in batch:
+            try:
+                fd, temp_path = open_temp_file(path)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                staged.append((path, temp_path, job_id))
+            except Exception as e:
+                results.append((job_id, {"status": "failed", "error": str(e)}))
+
+        directories = set()
+        for path, temp_path, job_id in staged:
+            try:
+                with open(temp_path, 'rb+') as f:
+                    os.fsync(f.fileno())
+                os.replace(temp_path, path)
+                directories.add(os.path.dirname(path))
+                results.append((job_id, {"status": "durable"}))
+            except Exception as e:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                results.append((job_id, {"status": "failed", "error": str(e)}))
+
+        for directory in directories:
+            try:
+                fsync_directory(directory)
+            except OSError:
+                # Some filesystems cannot sync directories; the rename itself is done
+                pass
+
+        completed_at = datetime.now().isoformat()
+        return [(job_id, {**fields, "completed_at": completed_at}) for job_id, fields in results]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write is durable"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.writing, timeout)
+
+    def close(self) -> None:
+        """Write everything still queued and stop the background thread"""
+        with self.condition:
+            if self.stopped:
+                return
+            self.stopped = True
+            self.condition.notify_all()
+        self.thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and tracked job counts"""
+        with self.condition:
+            statuses = {}
+            for job in self.jobs.values():
+                statuses[job['status']] = statuses.get(job['status'], 0) + 1
+            return {"pending": len(self.pending), "writing": self.writing, "jobs": statuses}
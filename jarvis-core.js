@@ -440,14 +440,16 @@ class JarvisCore {
             const cpuElement = document.getElementById('cpuUsage');
             const memoryElement = document.getElementById('memoryUsage');
             const networkElement = document.getElementById('networkStatus');
+            // The system monitor shows live server samples when its event stream is up
+            const liveMetrics = window.systemMonitor && window.systemMonitor.liveMetrics;
             
-            if (cpuElement) {
+            if (cpuElement && !liveMetrics) {
                 const cpuUsage = Math.floor(Math.random() * 30) + 10; // 10-40%
                 cpuElement.textContent = cpuUsage + '%';
                 cpuElement.style.color = cpuUsage > 70 ? '#ff4444' : '#00ff00';
             }
             
-            if (memoryElement) {
+            if (memoryElement && !liveMetrics) {
                 const memoryUsage = Math.floor(Math.random() * 40) + 30; // 30-70%
                 memoryElement.textContent = memoryUsage + '%';
                 memoryElement.style.color = memoryUsage > 80 ? '#ff4444' : '#00ff00';
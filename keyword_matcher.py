@@ -0,0 +1,104 @@
+# JARVIS Keyword Matcher
+# Aho-Corasick automaton that finds every keyword hit in one pass over the input
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class KeywordMatcher:
+    """Matches a fixed set of keywords, including overlapping hits, in linear time"""
+
+    def __init__(self, tables: Dict[str, Dict[str, Iterable[str]]]):
+        """
+        Build the automaton
+
+        Args:
+            tables: {table: {label: keywords}}, e.g.
+                {'technology': {'python': ['python', 'script']}}
+        """
+        self.tables = tables
+        self.payloads: Dict[str, List[Tuple[str, str]]] = {}
+        for table, labels in tables.items():
+            for label, keywords in labels.items():
+                for keyword in keywords:
+                    keyword = keyword.lower()
+                    if (table, label) not in self.payloads.setdefault(keyword, []):
+                        self.payloads[keyword].append((table, label))
+
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+        for keyword in self.payloads:
+            self.insert(keyword)
+        self.build_failure_links()
+
+    def insert(self, keyword: str) -> None:
+        """Add one keyword to the trie"""
+        state = 0
+        for char in keyword:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append(keyword)
+
+    def build_failure_links(self) -> None:
+        """Breadth-first pass linking each state to its longest proper suffix state"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_all(self, text: str) -> List[Dict[str, Any]]:
+        """Every keyword occurrence in text, case-insensitive, ordered by end position
+
+        Offsets index into text itself, even where lowercasing a character
+        yields more than one character.
+        """
+        hits = []
+        state = 0
+        goto = self.goto
+        fail = self.fail
+        # Index in text of each lowercased character fed to the automaton
+        origins = []
+        for index, original in enumerate(text):
+            for char in original.lower():
+                origins.append(index)
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                for keyword in self.output[state]:
+                    hits.append({
+                        "keyword": keyword,
+                        "start": origins[len(origins) - len(keyword)],
+                        "end": index + 1,
+                        "matches": self.payloads[keyword]
+                    })
+        return hits
+
+    def first_label(self, hits: List[Dict[str, Any]], table: str) -> Any:
+        """First label of a table, in table order, that has any hit"""
+        found = {label for hit in hits for hit_table, label in hit["matches"] if hit_table == table}
+        for label in self.tables[table]:
+            if label in found:
+                return label
+        return None
+
+    def labels_by_position(self, hits: List[Dict[str, Any]], table: str) -> List[str]:
+        """Distinct labels of a table in the order they first appear in the text"""
+        ordered = []
+        for hit in sorted(hits, key=lambda hit: hit["start"]):
+            for hit_table, label in hit["matches"]:
+                if hit_table == table and label not in ordered:
+                    ordered.append(label)
+        return ordered
@@ -0,0 +1,137 @@
+# JARVIS Render Cache
+# Bounded LRU caches for rendered template output and other derived results
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class RenderCache:
+    """LRU cache with an entry limit, a memory budget and an optional TTL"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024,
+                 ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, version: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (content, validation) if cached for this template version"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry_version, content, validation, size, stored_at = entry
+            if entry_version is not version or (self.ttl is not None and time.monotonic() - stored_at > self.ttl):
+                # Template was reloaded or the entry is too old
+                self.remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return content, validation
+
+    def put(self, key: Hashable, version: Any, content: str, validation: Dict[str, Any]) -> None:
+        """Store a rendered result, evicting least recently used entries over budget"""
+        size = sys.getsizeof(content)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = (version, content, validation, size, time.monotonic())
+            self.total_bytes += size
+
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self.remove(oldest)
+                self.evictions += 1
+
+    def remove(self, key: Hashable) -> None:
+        """Drop an entry; caller must hold the lock"""
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry[3]
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current usage"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+class MemoCache:
+    """Small LRU memo for derived results, with hit-rate counters"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        """Cached value for key if it was computed against this version"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] is not version:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, version: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entries"""
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,141 @@
+# JARVIS Search Index
+# Incrementally maintained inverted index with BM25 ranking over templates and generated code
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from template_index import tokenize
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_WIDTH = 160
+
+
+def term_counts(text: str) -> Counter:
+    """Term frequencies of a document body"""
+    return Counter(tokenize(text))
+
+
+class SearchIndex:
+    """Term -> {document: term frequency} postings that support add and remove per document"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        # document number -> (key, kind, length, distinct terms, metadata)
+        self.documents: Dict[int, Tuple[Hashable, str, int, Tuple[str, ...], Dict[str, Any]]] = {}
+        self.keys: Dict[Hashable, int] = {}
+        self.next_document = 0
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    def add(self, key: Hashable, kind: str, counts: Counter, metadata: Dict[str, Any]) -> None:
+        """Index a document from its term counts, replacing any earlier version with the same key"""
+        with self.lock:
+            if key in self.keys:
+                self.remove_locked(key)
+            number = self.next_document
+            self.next_document += 1
+            for term, count in counts.items():
+                self.postings.setdefault(term, {})[number] = count
+            length = sum(counts.values())
+            self.documents[number] = (key, kind, length, tuple(counts), metadata)
+            self.keys[key] = number
+            self.total_length += length
+
+    def remove(self, key: Hashable) -> None:
+        """Drop a document if it is indexed"""
+        with self.lock:
+            if key in self.keys:
+                self.remove_locked(key)
+
+    def remove_locked(self, key: Hashable) -> None:
+        """Drop a document; caller must hold the lock"""
+        number = self.keys.pop(key)
+        _, _, length, terms, _ = self.documents.pop(number)
+        for term in terms:
+            posting = self.postings[term]
+            del posting[number]
+            if not posting:
+                del self.postings[term]
+        self.total_length -= length
+
+    def remove_kind(self, kind: str) -> None:
+        """Drop every document of one kind"""
+        with self.lock:
+            for key in [document[0] for document in self.documents.values() if document[1] == kind]:
+                self.remove_locked(key)
+
+    def search(self, query: str, limit: int = 20, kind: Optional[str] = None,
+               language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Rank documents against a query with BM25
+
+        Args:
+            query: Free text; every term contributes, documents need not match all of them
+            limit: Maximum results
+            kind: Only documents of this kind ('template' or 'generation')
+            language: Only documents whose metadata has this language
+
+        Returns:
+            Result dicts with 'key', 'kind', 'score' and the stored metadata, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self.lock:
+            total = len(self.documents)
+            if not terms or not total:
+                return []
+            average_length = self.total_length / total
+            scores: Dict[int, float] = {}
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                for number, frequency in posting.items():
+                    length = self.documents[number][2]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[number] = scores.get(number, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+            documents = self.documents
+            candidates = (
+                (score, number) for number, score in scores.items()
+                if (kind is None or documents[number][1] == kind)
+                and (language is None or documents[number][4].get('language') == language)
+            )
+            results = []
+            for score, number in heapq.nlargest(limit, candidates):
+                key, document_kind, _, _, metadata = documents[number]
+                results.append({"key": key, "kind": document_kind, "score": round(score, 4), **metadata})
+            return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size"""
+        with self.lock:
+            kinds = Counter(document[1] for document in self.documents.values())
+            return {
+                "documents": len(self.documents),
+                "terms": len(self.postings),
+                "by_kind": dict(kinds)
+            }
+
+
+def make_snippet(text: str, query: str, width: int = SNIPPET_WIDTH) -> Optional[Dict[str, Any]]:
+    """The text around the first query term it contains, with its line number"""
+    terms = sorted(set(tokenize(query)), key=len, reverse=True)
+    if not terms or not text:
+        return None
+    match = re.search('|'.join(re.escape(term) for term in terms), text, re.IGNORECASE)
+    if not match:
+        return None
+    start = max(0, match.start() - width // 2)
+    end = min(len(text), start + width)
+    excerpt = text[start:end].strip()
+    return {
+        "text": ('…' if start else '') + excerpt + ('…' if end < len(text) else ''),
+        "line": text.count('\n', 0, match.start()) + 1
+    }
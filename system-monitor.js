@@ -5,6 +5,8 @@ class SystemMonitor {
     constructor() {
         this.isMonitoring = false;
         this.updateInterval = null;
+        this.eventSource = null;
+        this.liveMetrics = false;
         this.metrics = {
             cpu: 0,
             memory: 0,
@@ -25,6 +27,7 @@ class SystemMonitor {
     init() {
         this.setupEventListeners();
         this.loadSystemInfo();
+        this.connectEventStream();
         this.startMonitoring();
         
         console.log('JARVIS System Monitor initialized');
@@ -117,6 +120,50 @@ class SystemMonitor {
         }
     }
 
+    connectEventStream() {
+        // One server-pushed stream per page instead of polling the backend
+        if (!('EventSource' in window)) return;
+
+        this.eventSource = new EventSource('http://localhost:5001/api/events');
+
+        this.eventSource.addEventListener('metrics', (event) => {
+            this.liveMetrics = true;
+            this.applyServerSample(JSON.parse(event.data));
+        });
+
+        this.eventSource.addEventListener('generation', (event) => {
+            const data = JSON.parse(event.data);
+            data.files.forEach(file => this.logEvent('Code Generated', file.path));
+        });
+
+        this.eventSource.addEventListener('templates', (event) => {
+            const data = JSON.parse(event.data);
+            this.logEvent('Templates Reloaded', [...data.updated, ...data.removed].join(', '));
+        });
+
+        this.eventSource.onerror = () => {
+            // EventSource reconnects by itself; simulate until samples arrive again
+            this.liveMetrics = false;
+        };
+    }
+
+    applyServerSample(sample) {
+        this.metrics.cpu = sample.cpu_percent;
+        this.metrics.memory = sample.memory_percent;
+
+        this.history.cpu.push(sample.cpu_percent);
+        if (this.history.cpu.length > 50) {
+            this.history.cpu.shift();
+        }
+        this.history.memory.push(sample.memory_percent);
+        if (this.history.memory.length > 50) {
+            this.history.memory.shift();
+        }
+
+        this.updateCPUDisplay();
+        this.updateMemoryDisplay();
+    }
+
     updateMetrics() {
         this.updateCPUMetrics();
         this.updateMemoryMetrics();
@@ -126,6 +173,9 @@ class SystemMonitor {
     }
 
     updateCPUMetrics() {
+        // Server samples arrive over the event stream while it is connected
+        if (this.liveMetrics) return;
+
         // Simulate CPU usage (in real implementation, would use Performance API)
         const cpuUsage = this.simulateCPULoad();
         this.metrics.cpu = cpuUsage;
@@ -148,6 +198,8 @@ class SystemMonitor {
     }
 
     updateMemoryMetrics() {
+        if (this.liveMetrics) return;
+
         // Simulate memory usage
         const memoryUsage = this.simulateMemoryUsage();
         this.metrics.memory = memoryUsage;
@@ -500,6 +552,10 @@ class SystemMonitor {
     // Cleanup
     destroy() {
         this.stopMonitoring();
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
         // Clean up event listeners if needed
     }
 }
@@ -0,0 +1,198 @@
+# JARVIS System Metrics
+# Background psutil sampler writing into a fixed-size, array-backed ring buffer
+
+import os
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import psutil
+except ImportError:
+    # Without psutil there is nothing to sample; callers fall back to static info
+    psutil = None
+
+METRIC_FIELDS = (
+    'timestamp',
+    'cpu_percent',
+    'memory_percent',
+    'memory_used',
+    'memory_available',
+    'swap_percent',
+    'disk_read_bytes_per_sec',
+    'disk_write_bytes_per_sec',
+    'net_sent_bytes_per_sec',
+    'net_recv_bytes_per_sec',
+    'load_average',
+    'process_cpu_percent',
+    'process_memory_rss',
+    'process_threads',
+    'process_count'
+)
+TOP_PROCESS_COUNT = 5
+
+
+class MetricsRing:
+    """Fixed-capacity ring of samples stored as rows of flat double arrays"""
+
+    def __init__(self, fields: Sequence[str], capacity: int, core_count: int):
+        self.fields = tuple(fields)
+        self.width = len(self.fields)
+        self.capacity = capacity
+        self.core_count = core_count
+        self.values = array('d', [0.0]) * (capacity * self.width)
+        self.cores = array('d', [0.0]) * (capacity * core_count)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, values: Sequence[float], cores: Sequence[float]) -> None:
+        """Overwrite the oldest row with a new sample"""
+        with self.lock:
+            row = self.count % self.capacity
+            self.values[row * self.width:(row + 1) * self.width] = array('d', values)
+            cores = list(cores)[:self.core_count]
+            cores.extend([0.0] * (self.core_count - len(cores)))
+            self.cores[row * self.core_count:(row + 1) * self.core_count] = array('d', cores)
+            self.count += 1
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """The most recent sample, or None before the first one"""
+        with self.lock:
+            if not self.count:
+                return None
+            row = (self.count - 1) % self.capacity
+            sample = dict(zip(self.fields, self.values[row * self.width:(row + 1) * self.width]))
+            sample['cores'] = self.cores[row * self.core_count:(row + 1) * self.core_count].tolist()
+            sample['sequence'] = self.count
+            return sample
+
+    def history(self, limit: Optional[int] = None) -> Dict[str, List[float]]:
+        """Up to limit of the latest samples as columns, oldest first"""
+        with self.lock:
+            size = min(self.count, self.capacity)
+            if limit is not None:
+                size = min(size, limit)
+            first = self.count - size
+            rows = [(first + offset) % self.capacity for offset in range(size)]
+            columns = {
+                field: [self.values[row * self.width + index] for row in rows]
+                for index, field in enumerate(self.fields)
+            }
+            columns['cores'] = [self.cores[row * self.core_count:(row + 1) * self.core_count].tolist() for row in rows]
+            return columns
+
+
+class SystemSampler:
+    """Collects CPU, memory, disk, network and process metrics on a background thread"""
+
+    def __init__(self, interval: float = 2.0, capacity: int = 300):
+        self.interval = interval
+        self.ring = MetricsRing(METRIC_FIELDS, capacity, psutil.cpu_count() or 1)
+        self.process = psutil.Process(os.getpid())
+        self.top_processes: List[Dict[str, Any]] = []
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.previous = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        # Prime the CPU counters so the first real sample has a baseline
+        psutil.cpu_percent(percpu=True)
+        self.process.cpu_percent()
+
+    def sample(self) -> None:
+        """Take one sample and append it to the ring"""
+        now = time.time()
+        cores = psutil.cpu_percent(percpu=True)
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        disk = psutil.disk_io_counters()
+        network = psutil.net_io_counters()
+        counters = (
+            disk.read_bytes if disk else 0.0,
+            disk.write_bytes if disk else 0.0,
+            network.bytes_sent if network else 0.0,
+            network.bytes_recv if network else 0.0
+        )
+
+        if self.previous is None:
+            rates = (0.0,) * len(counters)
+        else:
+            elapsed = max(now - self.previous[0], 1e-6)
+            rates = tuple(max(0.0, (current - last) / elapsed)
+                          for current, last in zip(counters, self.previous[1]))
+        self.previous = (now, counters)
+
+        with self.process.oneshot():
+            process_cpu = self.process.cpu_percent()
+            process_rss = self.process.memory_info().rss
+            process_threads = self.process.num_threads()
+
+        processes = []
+        for process in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+            processes.append(process.info)
+        processes.sort(key=lambda info: info['cpu_percent'] or 0.0, reverse=True)
+        self.top_processes = [{
+            "pid": info['pid'],
+            "name": info['name'],
+            "cpu_percent": info['cpu_percent'] or 0.0,
+            "memory_percent": round(info['memory_percent'] or 0.0, 2)
+        } for info in processes[:TOP_PROCESS_COUNT]]
+
+        self.ring.append((
+            now,
+            sum(cores) / len(cores) if cores else 0.0,
+            memory.percent,
+            memory.used,
+            memory.available,
+            swap.percent,
+            *rates,
+            psutil.getloadavg()[0],
+            process_cpu,
+            process_rss,
+            process_threads,
+            len(processes)
+        ), cores)
+
+        sample = self.latest()
+        for listener in self.listeners:
+            listener(sample)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call listener with every new sample, on the sampler thread"""
+        self.listeners.append(listener)
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def run():
+            while True:
+                try:
+                    self.sample()
+                except Exception as e:
+                    print(f"Error sampling system metrics: {e}")
+                if self.stop_event.wait(self.interval):
+                    return
+
+        self.thread = threading.Thread(target=run, name="system-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampling thread"""
+        if self.thread:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent sample with the top processes, without any system calls"""
+        sample = self.ring.latest()
+        if sample is not None:
+            sample['top_processes'] = self.top_processes
+        return sample
+
+    def history(self, limit: Optional[int] = None) -> Dict[str, List[float]]:
+        """Recent samples as columns, oldest first"""
+        return self.ring.history(limit)
@@ -0,0 +1,134 @@
+# JARVIS Template Engine
+# Compiles template bodies into literal/placeholder segments for single-pass rendering
+
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterator, List, Tuple
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+# Placeholders filled automatically when the caller does not supply them
+BUILTIN_PLACEHOLDERS = frozenset({'date'})
+
+
+class CompiledTemplate:
+    """Template body split once into literal text and placeholder slots"""
+
+    __slots__ = ('source', 'segments', 'slots', 'placeholders')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.segments: List[str] = []
+        self.slots: List[Tuple[int, str]] = []
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > position:
+                self.segments.append(source[position:match.start()])
+            # The raw placeholder text is kept so unfilled slots render unchanged
+            self.slots.append((len(self.segments), match.group(1)))
+            self.segments.append(match.group(0))
+            position = match.end()
+        if position < len(source):
+            self.segments.append(source[position:])
+
+        self.placeholders: FrozenSet[str] = frozenset(key for _, key in self.slots)
+
+    def render(self, parameters: Dict[str, Any]) -> str:
+        """Render the template in a single join pass"""
+        return ''.join(self.iter_parts(parameters))
+
+    def iter_parts(self, parameters: Dict[str, Any]) -> Iterator[str]:
+        """Yield literal segments and filled placeholder values in order"""
+        slots = dict(self.slots)
+        values = {}
+        for index, segment in enumerate(self.segments):
+            key = slots.get(index)
+            if key is None:
+                yield segment
+                continue
+            if key not in values:
+                if key in parameters:
+                    values[key] = str(parameters[key])
+                elif key == 'date':
+                    values[key] = datetime.now().strftime("%Y-%m-%d")
+                else:
+                    # Unfilled placeholders render unchanged
+                    values[key] = segment
+            yield values[key]
+
+    def iter_render(self, parameters: Dict[str, Any], chunk_size: int = 16384) -> Iterator[str]:
+        """Render incrementally, yielding chunks of roughly chunk_size characters"""
+        buffer = []
+        buffered = 0
+        for part in self.iter_parts(parameters):
+            while buffered + len(part) >= chunk_size:
+                split = chunk_size - buffered
+                buffer.append(part[:split])
+                yield ''.join(buffer)
+                part = part[split:]
+                buffer = []
+                buffered = 0
+            if part:
+                buffer.append(part)
+                buffered += len(part)
+        if buffer:
+            yield ''.join(buffer)
+
+    def check_parameters(self, parameters: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Report placeholders without a value and parameters the template never uses"""
+        supplied = set(parameters)
+        return {
+            "missing": sorted(self.placeholders - supplied - BUILTIN_PLACEHOLDERS),
+            "unused": sorted(supplied - self.placeholders)
+        }
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> CompiledTemplate:
+    """Compile a template body, reusing earlier compilations of the same text"""
+    return CompiledTemplate(source)
+
+
+class LazyTemplate(dict):
+    """Template metadata from the manifest; the body is parsed on first access
+
+    Indexing, get and 'in' all load the body when asked for a key the
+    metadata lacks. Callers that must not trigger a load read through
+    dict.get directly.
+    """
+
+    def __init__(self, metadata: Dict[str, Any], template_path: str, content_hash: str,
+                 placeholders: List[str] = ()):
+        super().__init__(metadata)
+        self.template_path = template_path
+        self.content_hash = content_hash
+        self.placeholders = tuple(placeholders)
+        self.loaded = False
+
+    def __missing__(self, key: str) -> Any:
+        if not self.loaded:
+            self.load()
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not self.loaded and not dict.__contains__(self, key):
+            self.load()
+        return dict.get(self, key, default)
+
+    def __contains__(self, key: Any) -> bool:
+        if not self.loaded and not dict.__contains__(self, key):
+            self.load()
+        return dict.__contains__(self, key)
+
+    def load(self) -> None:
+        """Parse and compile the template body, keeping it in memory afterwards"""
+        with open(self.template_path, 'r') as f:
+            template_data = json.load(f)
+        template_data['compiled'] = compile_template(template_data['content'])
+        self.update(template_data)
+        self.loaded = True
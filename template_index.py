@@ -0,0 +1,224 @@
+# JARVIS Template Index
+# Precomputed TF-IDF vectors and an edit-distance tree over template metadata
+
+import math
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    # Pure-Python fallback for environments without numpy
+    np = None
+
+WORD_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+# Hashed feature space keeps the bucket table fixed however large the vocabulary gets
+VECTOR_DIMENSIONS = 4096
+NGRAM_SIZE = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words, splitting snake_case and camelCase identifiers"""
+    return [word.lower() for word in WORD_PATTERN.findall(text)]
+
+
+def features(text: str) -> Dict[int, float]:
+    """Term counts of words and padded character n-grams, hashed into buckets"""
+    counts: Dict[int, float] = {}
+    for word in tokenize(text):
+        grams = [f"w:{word}"]
+        padded = f" {word} "
+        grams.extend(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+        for gram in grams:
+            bucket = zlib.crc32(gram.encode('utf-8')) % VECTOR_DIMENSIONS
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    return counts
+
+
+class TemplateVectorIndex:
+    """TF-IDF vectors of template descriptions, stored as sparse per-bucket postings
+
+    Each description only touches a few dozen buckets, so the weights are kept
+    column-wise (bucket -> rows and weights) and a query only reads the
+    columns of its own buckets.
+    """
+
+    def __init__(self, documents: Iterable[Dict[str, Any]], source: Any = None):
+        """
+        Build the index
+
+        Args:
+            documents: dicts with 'id', 'name', 'language' and 'text'
+            source: the template index the documents came from, to detect staleness
+        """
+        self.source = source
+        self.documents = list(documents)
+        term_counts = [features(document['text']) for document in self.documents]
+
+        document_frequency: Dict[int, int] = {}
+        for counts in term_counts:
+            for bucket in counts:
+                document_frequency[bucket] = document_frequency.get(bucket, 0) + 1
+        total = len(self.documents)
+        self.idf = {bucket: math.log((1 + total) / (1 + frequency)) + 1.0
+                    for bucket, frequency in document_frequency.items()}
+
+        rows = [self.weigh(counts) for counts in term_counts]
+        if np is not None:
+            # Compressed sparse columns: bucket b owns entries offsets[b]:offsets[b + 1]
+            buckets = np.fromiter((bucket for row in rows for bucket in row), dtype=np.int32)
+            order = np.argsort(buckets, kind='stable')
+            self.rows = np.repeat(np.arange(total, dtype=np.int32),
+                                  [len(row) for row in rows])[order]
+            self.weights = np.fromiter((weight for row in rows for weight in row.values()),
+                                       dtype=np.float32)[order]
+            self.offsets = np.zeros(VECTOR_DIMENSIONS + 1, dtype=np.int64)
+            np.cumsum(np.bincount(buckets, minlength=VECTOR_DIMENSIONS), out=self.offsets[1:])
+        else:
+            self.postings: Dict[int, List[Tuple[int, float]]] = {}
+            for row_index, row in enumerate(rows):
+                for bucket, weight in row.items():
+                    self.postings.setdefault(bucket, []).append((row_index, weight))
+
+    def weigh(self, counts: Dict[int, float]) -> Dict[int, float]:
+        """Apply IDF weights and L2-normalize; unseen buckets carry no signal"""
+        weighted = {bucket: (1.0 + math.log(count)) * self.idf[bucket]
+                    for bucket, count in counts.items() if bucket in self.idf}
+        norm = math.sqrt(sum(weight * weight for weight in weighted.values()))
+        if not norm:
+            return {}
+        return {bucket: weight / norm for bucket, weight in weighted.items()}
+
+    def query(self, text: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k templates by cosine similarity to the text"""
+        vector = self.weigh(features(text))
+        if not vector or not self.documents:
+            return []
+
+        if np is not None:
+            spans = [(self.offsets[bucket], self.offsets[bucket + 1], weight) for bucket, weight in vector.items()]
+            rows = np.concatenate([self.rows[start:end] for start, end, _ in spans])
+            contributions = np.concatenate([self.weights[start:end] * weight for start, end, weight in spans])
+            scores = np.bincount(rows, weights=contributions, minlength=len(self.documents))
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            ranked = sorted(((float(scores[i]), int(i)) for i in top), reverse=True)
+        else:
+            scores: Dict[int, float] = {}
+            for bucket, weight in vector.items():
+                for row_index, row_weight in self.postings.get(bucket, ()):
+                    scores[row_index] = scores.get(row_index, 0.0) + row_weight * weight
+            ranked = sorted(((score, i) for i, score in scores.items()), reverse=True)[:k]
+
+        return [{
+            "id": self.documents[i]['id'],
+            "name": self.documents[i]['name'],
+            "language": self.documents[i]['language'],
+            "score": round(score, 4)
+        } for score, i in ranked if score > 0]
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase letters and digits only, so 'React Component' and 'react_component' agree"""
+    return ''.join(char for char in text.lower() if char.isalnum())
+
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    """
+    Levenshtein distance, capped at limit + 1
+
+    Bit-parallel (Myers/Hyyrö): each column of the dynamic-programming table
+    is one integer, so a pair costs a few integer operations per character
+    instead of a full row of cell updates.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    if len(first) < len(second):
+        first, second = second, first
+    if not second:
+        return min(len(first), limit + 1)
+
+    matches: Dict[str, int] = {}
+    for index, char in enumerate(second):
+        matches[char] = matches.get(char, 0) | (1 << index)
+    full = (1 << len(second)) - 1
+    last = 1 << (len(second) - 1)
+    positive = full
+    negative = 0
+    distance = len(second)
+    for char in first:
+        equal = matches.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & full
+        negative = horizontal_positive & vertical & full
+    return min(distance, limit + 1)
+
+
+class BKTree:
+    """Burkhard-Keller tree over normalized names for bounded edit-distance lookups"""
+
+    def __init__(self, names: Iterable[Tuple[str, str]], source: Any = None):
+        """
+        Build the tree
+
+        Args:
+            names: (name, value) pairs; several names may map to one value
+            source: the template index the names came from, to detect staleness
+        """
+        self.source = source
+        self.root = None
+        self.values: Dict[str, List[str]] = {}
+        for name, value in names:
+            term = normalize_name(name)
+            if not term:
+                continue
+            if term in self.values:
+                if value not in self.values[term]:
+                    self.values[term].append(value)
+                continue
+            self.values[term] = [value]
+            self.insert(term)
+
+    def insert(self, term: str) -> None:
+        """Add a new term below the node at its distance"""
+        if self.root is None:
+            self.root = (term, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(term, node[0], max(len(term), len(node[0])))
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (term, {})
+                return
+            node = child
+
+    def query(self, name: str, max_distance: int) -> List[Tuple[int, str]]:
+        """(distance, value) pairs within max_distance of name, closest first"""
+        term = normalize_name(name)
+        if not term or self.root is None:
+            return []
+        found = {}
+        stack = [self.root]
+        while stack:
+            node_term, children = stack.pop()
+            distance = edit_distance(term, node_term, max(len(term), len(node_term)))
+            if distance <= max_distance:
+                for value in self.values[node_term]:
+                    found[value] = min(distance, found.get(value, distance))
+            # Triangle inequality: only children in this band can be close enough
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted((distance, value) for value, distance in found.items())
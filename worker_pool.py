@@ -0,0 +1,127 @@
+# JARVIS Worker Pool
+# Process pool with a hard per-job timeout, shared by code validation and the expression engine
+
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# Workers start from a clean server process rather than a fork of this one,
+# which already runs threads (samplers, writers, watchers) whose locks a fork could copy mid-use.
+# Both methods import the main script in the workers, so it must not start anything on import.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+# A fresh pool may need to import the application before it can take a job
+STARTUP_TIMEOUT = 30.0
+
+
+class WorkerBusyError(TimeoutError):
+    """No job slot or started worker became available before the deadline"""
+
+
+class WorkerTimeoutError(TimeoutError):
+    """A job overran the timeout and its pool was killed"""
+
+
+class WorkerPool:
+    """Runs module-level functions in worker processes, killing any job that overruns
+
+    Workers start on a background thread, either ahead of time through
+    start() or when the first job arrives. A job waiting for them counts
+    that wait against its own deadline. A pool killed after a timeout is
+    replaced in the background the same way.
+    """
+
+    def __init__(self, workers: int, timeout: float, max_pending: Optional[int] = None):
+        self.workers = workers
+        self.timeout = timeout
+        self.context = multiprocessing.get_context(START_METHOD)
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.start_thread = None
+        self.slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 4)
+        self.timeouts = 0
+
+    def run(self, function: Callable, *args: Any) -> Any:
+        """
+        Call function(*args) in a worker, waiting at most timeout seconds in total
+
+        Waiting for a free slot, for the workers to start and for the result
+        share one deadline, so a caller is never held for longer than the
+        timeout.
+
+        Raises:
+            WorkerBusyError: no slot or started worker before the deadline
+            WorkerTimeoutError: the job did not finish before the deadline
+        """
+        deadline = time.monotonic() + self.timeout
+        if not self.slots.acquire(timeout=self.timeout):
+            raise WorkerBusyError("Worker pool is busy")
+        try:
+            pool = self.get_pool(deadline)
+            job = pool.apply_async(function, args)
+            try:
+                return job.get(max(0.0, deadline - time.monotonic()))
+            except multiprocessing.TimeoutError:
+                self.timeouts += 1
+                self.reset_pool(pool)
+                raise WorkerTimeoutError(f"Job timed out after {self.timeout} seconds") from None
+        finally:
+            self.slots.release()
+
+    def start(self) -> None:
+        """Start the workers in the background unless they are running or starting"""
+        with self.pool_lock:
+            if self.pool is not None or (self.start_thread and self.start_thread.is_alive()):
+                return
+            self.start_thread = threading.Thread(target=self.start_pool, name="worker-pool-start", daemon=True)
+            self.start_thread.start()
+
+    def start_pool(self) -> None:
+        """Create the pool and wait for a worker to answer; runs on the start thread"""
+        pool = None
+        try:
+            pool = self.context.Pool(self.workers)
+            pool.apply_async(os.getpid).get(STARTUP_TIMEOUT)
+        except Exception as e:
+            print(f"Error starting worker pool: {e}")
+            if pool:
+                pool.terminate()
+            return
+        with self.pool_lock:
+            self.pool = pool
+            self.ready.set()
+
+    def get_pool(self, deadline: float):
+        """The running pool, waiting until deadline for one that is starting"""
+        self.start()
+        if not self.ready.wait(max(0.0, deadline - time.monotonic())):
+            raise WorkerBusyError("Worker pool is starting")
+        with self.pool_lock:
+            pool = self.pool
+        if pool is None:
+            # Reset by another caller's timeout since ready was checked
+            raise WorkerBusyError("Worker pool is restarting")
+        return pool
+
+    def reset_pool(self, pool) -> None:
+        """Kill a pool whose worker is stuck and start a fresh one in the background"""
+        with self.pool_lock:
+            if self.pool is pool:
+                self.pool = None
+                self.ready.clear()
+        pool.terminate()
+        self.start()
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        start_thread = self.start_thread
+        if start_thread:
+            start_thread.join()
+        with self.pool_lock:
+            pool, self.pool = self.pool, None
+            self.ready.clear()
+        if pool:
+            pool.terminate()
+            pool.join()